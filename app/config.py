@@ -0,0 +1,57 @@
+# app/config.py
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+
+def env_int(name: str, default: int, *, minimum: int = 1) -> int:
+    """Int tuning knob from env; unset, malformed or < minimum falls back to default instead of failing the import."""
+    try:
+        value = int((os.getenv(name) or "").strip() or default)
+    except ValueError:
+        return default
+    return value if value >= minimum else default
+
+
+def env_float(name: str, default: float, *, allow_zero: bool = False) -> float:
+    """Float tuning knob from env; unset, malformed, negative or NaN (or 0 unless allow_zero) falls back to default."""
+    try:
+        value = float((os.getenv(name) or "").strip() or default)
+    except ValueError:
+        return default
+    return value if value > 0 or (allow_zero and value == 0) else default
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """
+    Environment shared by the console pipelines, read once per process.
+    Required keys raise KeyError like the old module-level os.environ[...] lookups.
+    """
+
+    client_id: str
+    database_url: str
+    fernet_key: str
+    graph_api_version: str = "v17.0"
+    default_ad_link_url: Optional[str] = None  # each pipeline keeps its own fallback
+    pipeline_debug: bool = False
+
+    @classmethod
+    def from_env(cls) -> "Config":
+        return cls(
+            client_id=os.environ["CLIENT_ID"],
+            database_url=os.environ["DATABASE_URL"],
+            fernet_key=os.environ["TOKEN_ENCRYPTION_KEY"],
+            graph_api_version=os.getenv("GRAPH_API_VERSION", "v17.0"),
+            default_ad_link_url=os.getenv("DEFAULT_AD_LINK_URL") or None,
+            pipeline_debug=os.getenv("PIPELINE_DEBUG", "0") == "1",
+        )
+
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Process-wide Config. Call after load_dotenv() so .env values are picked up."""
+    return Config.from_env()
@@ -0,0 +1,94 @@
+# app/console/json_dump.py
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Optional
+
+# Optional dependency (graceful)
+try:
+    import orjson  # type: ignore
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+_PRIMITIVES = frozenset({str, int, float, bool, type(None)})
+
+
+def _dump_list(obj):
+    return [to_jsonable(x) for x in obj]
+
+
+def _dump_dict(obj):
+    return {str(k): to_jsonable(v) for k, v in obj.items()}
+
+
+# exact-type dispatch: one dict lookup per node instead of an isinstance cascade
+_DISPATCH = {list: _dump_list, tuple: _dump_list, dict: _dump_dict}
+
+
+def _model_dump_json(obj):
+    return obj.model_dump(mode="json")
+
+
+def _dict_dump(obj):
+    return obj.dict()
+
+
+# type -> model_dump / .dict() / None, resolved once per class instead of hasattr() per node
+_DUMP_METHOD_CACHE: dict[type, Optional[Callable[[Any], Any]]] = {}
+
+
+def _dump_method(t: type) -> Optional[Callable[[Any], Any]]:
+    try:
+        return _DUMP_METHOD_CACHE[t]
+    except KeyError:
+        pass
+    if hasattr(t, "model_dump"):
+        dumper = _model_dump_json
+    elif hasattr(t, "dict"):
+        dumper = _dict_dump
+    else:
+        dumper = None
+    _DUMP_METHOD_CACHE[t] = dumper
+    return dumper
+
+
+def to_jsonable(obj):
+    t = type(obj)
+    if t in _PRIMITIVES:
+        return obj
+    fn = _DISPATCH.get(t)
+    if fn is not None:
+        return fn(obj)
+
+    # subclasses (str enums, OrderedDict, ...) and objects
+    if isinstance(obj, (str, int, float, bool)):
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return _dump_list(obj)
+    if isinstance(obj, dict):
+        return _dump_dict(obj)
+    dumper = _dump_method(t)
+    if dumper is not None:
+        try:
+            return dumper(obj)
+        except Exception:
+            pass
+    if hasattr(obj, "__dict__"):
+        try:
+            return {k: to_jsonable(v) for k, v in obj.__dict__.items() if not k.startswith("_")}
+        except Exception:
+            pass
+    return repr(obj)
+
+
+def pretty_dumps(obj) -> str:
+    """
+    Pretty JSON for the step logs. With orjson, dicts/lists/primitives are encoded in C and
+    to_jsonable only runs (as default=) for objects orjson can't handle (models, dataclasses...).
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(
+            obj, default=to_jsonable, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode("utf-8")
+    return json.dumps(to_jsonable(obj), indent=2, ensure_ascii=False)
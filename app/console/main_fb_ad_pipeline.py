@@ -2,18 +2,16 @@
 from __future__ import annotations
 
 import os
-import json
-import traceback
 from pathlib import Path
 import tempfile
-from typing import Any
+from typing import Optional
 
-from fastapi import UploadFile
 from dotenv import load_dotenv
 
-from app.models.fb_ads_stairway import FbAdsStairway
+from app.config import get_config
+from app.console.json_dump import pretty_dumps
+from app.console.pipeline_config import PipelineConfig
 from app.routers.DB_helpers.meta_token_db_reader import MetaTokenDbReader
-from app.models.spaces_uploader import SpacesUploader
 
 load_dotenv()
 
@@ -21,75 +19,57 @@ load_dotenv()
 VIDEO_PATH = r"C:\Users\User\Desktop\Ig_Reels\example.mp4"
 IMAGE_PATH = r"C:\Users\User\Pictures\example.jpg"
 
-CLIENT_ID = os.environ["CLIENT_ID"]
-GRAPH_API_VERSION = os.getenv("GRAPH_API_VERSION", "v17.0")
+CFG = get_config()
 
-DATABASE_URL = os.environ["DATABASE_URL"]
-FERNET_KEY = os.environ["TOKEN_ENCRYPTION_KEY"]
+CLIENT_ID = CFG.client_id
+GRAPH_API_VERSION = CFG.graph_api_version
+
+DATABASE_URL = CFG.database_url
+FERNET_KEY = CFG.fernet_key
 
 CAMPAIGN_NAME = "Automated FB Campaign_DB"
 OBJECTIVE = "OUTCOME_AWARENESS"
 INDEX = 0
 
-DEFAULT_LINK_URL = os.getenv("DEFAULT_AD_LINK_URL", "https://www.facebook.com/")
+DEFAULT_LINK_URL = CFG.default_ad_link_url or "https://www.facebook.com/"
 
 CAMPAIGN_STATUS = "ACTIVE"
 ADSET_STATUS = "ACTIVE"
 AD_STATUS = "ACTIVE"
 
-
-# ---------------- HELPERS ----------------
-def _to_jsonable(obj: Any):
-    if obj is None:
-        return None
-    if isinstance(obj, (str, int, float, bool)):
-        return obj
-    if isinstance(obj, (list, tuple)):
-        return [_to_jsonable(x) for x in obj]
-    if isinstance(obj, dict):
-        return {str(k): _to_jsonable(v) for k, v in obj.items()}
-    if hasattr(obj, "model_dump"):
-        try:
-            return obj.model_dump()
-        except Exception:
-            pass
-    if hasattr(obj, "dict"):
-        try:
-            return obj.dict()
-        except Exception:
-            pass
-    if hasattr(obj, "__dict__"):
-        try:
-            return {k: _to_jsonable(v) for k, v in obj.__dict__.items() if not k.startswith("_")}
-        except Exception:
-            pass
-    return repr(obj)
+# Step/debug dumps (PIPELINE_DEBUG=1). Off: dbg/log_response return before any serialization.
+DEBUG = CFG.pipeline_debug
 
 
+# ---------------- HELPERS ----------------
 def dbg(tag: str, payload) -> None:
+    if not DEBUG:
+        return
     try:
         print(f"\n[FB PIPELINE DBG] {tag}")
-        print(json.dumps(_to_jsonable(payload), indent=2, ensure_ascii=False))
+        print(pretty_dumps(payload))
         print("[/FB PIPELINE DBG]\n")
     except Exception:
         print(f"\n[FB PIPELINE DBG] {tag}: {payload!r}\n[/FB PIPELINE DBG]\n")
 
 
 def log_response(step: str, resp) -> None:
+    if not DEBUG:
+        print(f"[ok] {step}")
+        return
     print(f"\n---- {step} RESPONSE ----")
     try:
-        print(json.dumps(_to_jsonable(resp), indent=2, ensure_ascii=False))
+        print(pretty_dumps(resp))
     except Exception:
         print(repr(resp))
     print("---- END RESPONSE ----\n")
 
 
 def log_error(step: str, e: Exception) -> None:
-    print(f"\n!!!! {step} FAILED !!!!")
-    print(f"{type(e).__name__}: {e}")
-    print("\n[traceback]")
+    import traceback  # error path only
+
+    print(f"[FAILED] {step}: {type(e).__name__}: {e}")
     traceback.print_exc()
-    print("!!!! END ERROR !!!!\n")
 
 
 def choose_asset_mode_console() -> str:
@@ -143,12 +123,37 @@ def normalize_link(link: str) -> str:
     return "https://" + l
 
 
+_IMAGE_SUFFIXES = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+_VIDEO_SUFFIXES = frozenset({".mp4", ".mov", ".m4v"})
+
+
 def is_image_path(p: Path) -> bool:
-    return p.suffix.lower() in {".jpg", ".jpeg", ".png", ".webp"}
+    return p.suffix.lower() in _IMAGE_SUFFIXES
 
 
 def is_video_path(p: Path) -> bool:
-    return p.suffix.lower() in {".mp4", ".mov", ".m4v"}
+    return p.suffix.lower() in _VIDEO_SUFFIXES
+
+
+def check_carousel_paths(paths: list[str], *, allow_video: bool) -> list[str]:
+    """
+    Cheap stat + suffix pass over every item before anything is uploaded, so a bad path
+    never leaves earlier cards orphaned in Spaces / adimages / advideos. Returns each suffix.
+    Str paths throughout: one os.stat, no Path objects, messages built only on failure.
+    """
+    suffixes: list[str] = []
+    for p in paths:
+        try:
+            os.stat(p)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Carousel {'item' if allow_video else 'image'} not found: {p}") from None
+        suffix = os.path.splitext(p)[1].lower()
+        if suffix not in _IMAGE_SUFFIXES and not (allow_video and suffix in _VIDEO_SUFFIXES):
+            if allow_video:
+                raise ValueError(f"Unsupported carousel item type (image/video only): {p}")
+            raise ValueError(f"Carousel images only. Not an image: {p}")
+        suffixes.append(suffix)
+    return suffixes
 
 
 def prompt_carousel_paths(allow_video: bool) -> list[str]:
@@ -172,6 +177,38 @@ def prompt_carousel_paths(allow_video: bool) -> list[str]:
     return paths
 
 
+# ---------------- RUN CONFIG ----------------
+_CONFIG_DEFAULTS = {"link": "facebook.com", "video_path": VIDEO_PATH, "image_path": IMAGE_PATH}
+
+
+def config_from_prompts() -> PipelineConfig:
+    """Legacy console flow: same questions, asked up front."""
+    daily_budget = prompt_int(1000, "Daily budget")
+    title = prompt_text("Check this out!", "Ad title")
+    body = prompt_text("Discover more.", "Primary text (FB caption)")
+    link = prompt_text(_CONFIG_DEFAULTS["link"], "Redirect link")
+    mode = choose_asset_mode_console()
+
+    video_path, image_path, carousel_paths = VIDEO_PATH, IMAGE_PATH, []
+    if mode == "video":
+        video_path = prompt_path(VIDEO_PATH, "Video")
+    elif mode == "image":
+        image_path = prompt_path(IMAGE_PATH, "Image")
+    else:
+        carousel_paths = prompt_carousel_paths(allow_video=(mode == "carousel_mixed"))
+
+    return PipelineConfig(
+        mode=mode,
+        daily_budget=daily_budget,
+        title=title,
+        body=body,
+        link=link,
+        video_path=video_path,
+        image_path=image_path,
+        carousel_paths=carousel_paths,
+    )
+
+
 def download_url_to_tempfile(url: str, suffix: str = ".jpg", timeout_s: int = 60, retries: int = 3) -> str:
     """
     Robust thumbnail download (avoids urllib ContentTooShortError).
@@ -211,16 +248,32 @@ def download_url_to_tempfile(url: str, suffix: str = ".jpg", timeout_s: int = 60
 
 
 # ---------------- MAIN ----------------
-def main() -> None:
+def main(config: Optional[PipelineConfig] = None) -> None:
+    """
+    config=None reads the command line (PipelineConfig.from_args) and, without --mode/--config,
+    asks on stdin after STEP 2 like before. Pass a config to run without touching stdin.
+    """
+    if config is None:
+        config = PipelineConfig.from_args(
+            description="Create a paid Facebook ad end to end.", defaults=_CONFIG_DEFAULTS
+        )
+
+    # Graph stairway + boto3 only once a run starts: importing this module for its
+    # helpers (normalize_link, is_image_path, ...) stays cheap
+    from app.models.fb_ads_stairway import FbAdsStairway
+    from app.models.spaces_uploader import SpacesUploader
+
     reader = MetaTokenDbReader(database_url=DATABASE_URL, fernet_key=FERNET_KEY)
 
-    meta_user = reader.get_latest_meta_user_for_client(CLIENT_ID)
+    # meta_user + meta_page in one round-trip
+    bundle = reader.get_latest_bundle_for_client(CLIENT_ID)
+    meta_user, meta_page = bundle["meta_user"], bundle["meta_page"]
+
     log_response("DB meta_user (latest)", meta_user)
     meta_user_id = (meta_user or {}).get("meta_user_id")
     if not meta_user_id:
         raise RuntimeError("No meta_user_id found for this client in DB (meta_user table).")
 
-    meta_page = reader.get_latest_meta_page_for_client(CLIENT_ID)
     log_response("DB meta_page (latest)", meta_page)
     page_id = (meta_page or {}).get("page_id")
     if not page_id:
@@ -256,13 +309,15 @@ def main() -> None:
         log_error("STEP 2", e)
         return
 
-    daily_budget = prompt_int(1000, "Daily budget")
-    title = prompt_text("Check this out!", "Ad title")
-    body = prompt_text("Discover more.", "Primary text (FB caption)")
-    link = prompt_text("facebook.com", "Redirect link")
-    final_link = normalize_link(link)
+    if config is None:
+        config = config_from_prompts()
 
-    mode = choose_asset_mode_console()
+    daily_budget = config.daily_budget
+    title = config.title
+    body = config.body
+    final_link = normalize_link(config.link)
+
+    mode = config.mode
 
     # carousel modes still use "image" for adset creation in your current stairway
     asset_type = "video" if mode == "video" else "image"
@@ -293,7 +348,7 @@ def main() -> None:
     # =========================
     if mode == "video":
         try:
-            chosen_video_path = prompt_path(VIDEO_PATH, "Video")
+            chosen_video_path = config.video_path
             video_path = Path(chosen_video_path)
             if not video_path.exists():
                 raise FileNotFoundError(f"Video not found at {chosen_video_path}")
@@ -306,9 +361,7 @@ def main() -> None:
 
         try:
             print("STEP 5: Save video + generate Spaces URLs")
-            with open(video_path, "rb") as f:
-                upload_file = UploadFile(filename=video_path.name, file=f)
-                media = spaces.save_ad_media(upload_file)
+            media = spaces.save_ad_media_from_path(video_path)
             log_response("STEP 5 spaces.save_ad_media()", media)
 
             video_url = media.get("video_url")
@@ -351,7 +404,7 @@ def main() -> None:
     # =========================
     elif mode == "image":
         try:
-            chosen_image_path = prompt_path(IMAGE_PATH, "Image")
+            chosen_image_path = config.image_path
             image_path = Path(chosen_image_path)
             if not image_path.exists():
                 raise FileNotFoundError(f"Image not found at {chosen_image_path}")
@@ -390,32 +443,18 @@ def main() -> None:
     # =========================
     elif mode == "carousel_images":
         try:
-            raw_paths = prompt_carousel_paths(allow_video=False)
-            valid_image_paths: list[Path] = []
-            for p in raw_paths:
-                pp = Path(p)
-                if not pp.exists():
-                    raise FileNotFoundError(f"Carousel image not found: {p}")
-                if not is_image_path(pp):
-                    raise ValueError(f"Carousel images only. Not an image: {p}")
-                valid_image_paths.append(pp)
-
-            log_response("STEP 4 carousel_paths", [str(p) for p in valid_image_paths])
-            dbg("CAROUSEL_IMAGE_PATHS", [str(p) for p in valid_image_paths])
-        except Exception as e:
-            log_error("STEP 4", e)
-            return
+            print("STEP 4: Validate + upload carousel images to Meta")
+            check_carousel_paths(config.carousel_paths, allow_video=False)
+            hashes = [ads.upload_ad_image(adset_index=INDEX, image_path=p) for p in config.carousel_paths]
 
-        try:
-            print("STEP 5: Upload carousel images to Meta")
-            hashes = ads.upload_ad_images(adset_index=INDEX, image_paths=[str(p) for p in valid_image_paths])
-            log_response("STEP 5 carousel_image_hashes", hashes)
+            log_response("STEP 4 carousel_image_hashes", hashes)
+            dbg("CAROUSEL_IMAGE_PATHS", config.carousel_paths)
         except Exception as e:
-            log_error("STEP 5", e)
+            log_error("STEP 4", e)
             return
 
         try:
-            print("STEP 6: Create Facebook carousel creative + paid ad")
+            print("STEP 5: Create Facebook carousel creative + paid ad")
             child_attachments = [{"name": f"Card {i}", "link": final_link, "image_hash": h} for i, h in enumerate(hashes, start=1)]
             dbg("FB_CAROUSEL_CREATE_INPUT", {"child_attachments": child_attachments, "link_url": final_link})
 
@@ -427,9 +466,9 @@ def main() -> None:
                 child_attachments=child_attachments,
                 status=AD_STATUS,
             )
-            log_response("STEP 6 create_paid_fb_homogeneous_carousel_ad()", ad_result)
+            log_response("STEP 5 create_paid_fb_homogeneous_carousel_ad()", ad_result)
         except Exception as e:
-            log_error("STEP 6", e)
+            log_error("STEP 5", e)
             return
 
     # =========================
@@ -437,36 +476,19 @@ def main() -> None:
     # =========================
     else:
         try:
-            raw_paths = prompt_carousel_paths(allow_video=True)
-            valid_media_paths: list[Path] = []
-            for p in raw_paths:
-                pp = Path(p)
-                if not pp.exists():
-                    raise FileNotFoundError(f"Carousel item not found: {p}")
-                if not (is_image_path(pp) or is_video_path(pp)):
-                    raise ValueError(f"Unsupported carousel item type (image/video only): {p}")
-                valid_media_paths.append(pp)
-
-            log_response("STEP 4 carousel_media_paths", [str(p) for p in valid_media_paths])
-            dbg("FB_CAROUSEL_MEDIA_PATHS", [str(p) for p in valid_media_paths])
-        except Exception as e:
-            log_error("STEP 4", e)
-            return
-
-        try:
-            print("STEP 5: Upload carousel media (images + video)")
+            print("STEP 4: Validate + upload carousel media (images + video)")
+            dbg("FB_CAROUSEL_MEDIA_PATHS", config.carousel_paths)
+            suffixes = check_carousel_paths(config.carousel_paths, allow_video=True)
             child_attachments: list[dict] = []
 
-            for i, p in enumerate(valid_media_paths, start=1):
-                if is_image_path(p):
-                    h = ads.upload_ad_image(adset_index=INDEX, image_path=str(p))
+            for i, (p, suffix) in enumerate(zip(config.carousel_paths, suffixes), start=1):
+                if suffix in _IMAGE_SUFFIXES:
+                    h = ads.upload_ad_image(adset_index=INDEX, image_path=p)
                     child_attachments.append({"name": f"Card {i}", "link": final_link, "image_hash": h})
-                    dbg("FB_CAROUSEL_CHILD_ADD_IMAGE", {"i": i, "path": str(p), "image_hash": h})
+                    dbg("FB_CAROUSEL_CHILD_ADD_IMAGE", {"i": i, "path": p, "image_hash": h})
                 else:
                     # video -> Spaces upload -> hosted URL -> Meta upload
-                    with open(p, "rb") as f:
-                        upload_file = UploadFile(filename=p.name, file=f)
-                        media = spaces.save_ad_media(upload_file)
+                    media = spaces.save_ad_media_from_path(p)
 
                     video_url = media.get("video_url")
                     thumb_url = media.get("thumbnail_url")
@@ -486,17 +508,17 @@ def main() -> None:
                     )
                     dbg(
                         "FB_CAROUSEL_CHILD_ADD_VIDEO",
-                        {"i": i, "path": str(p), "video_id": vid, "thumb_hash": thumb_hash},
+                        {"i": i, "path": p, "video_id": vid, "thumb_hash": thumb_hash},
                     )
 
-            log_response("STEP 5 child_attachments", child_attachments)
+            log_response("STEP 4 child_attachments", child_attachments)
             dbg("FB_CAROUSEL_CHILD_ATTACHMENTS_FINAL", child_attachments)
         except Exception as e:
-            log_error("STEP 5", e)
+            log_error("STEP 4", e)
             return
 
         try:
-            print("STEP 6: Create Facebook mixed carousel creative + paid ad")
+            print("STEP 5: Create Facebook mixed carousel creative + paid ad")
             # REQUIRED: implement ads.create_paid_fb_mixed_carousel_ad(...) in FbAdsStairway
             ad_result = ads.create_paid_fb_mixed_carousel_ad(
                 adset_index=INDEX,
@@ -506,9 +528,9 @@ def main() -> None:
                 child_attachments=child_attachments,
                 status=AD_STATUS,
             )
-            log_response("STEP 6 create_paid_fb_mixed_carousel_ad()", ad_result)
+            log_response("STEP 5 create_paid_fb_mixed_carousel_ad()", ad_result)
         except Exception as e:
-            log_error("STEP 6", e)
+            log_error("STEP 5", e)
             return
 
 
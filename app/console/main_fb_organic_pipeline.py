@@ -7,23 +7,21 @@ load_dotenv()
 import os
 from pathlib import Path
 
-from fastapi import UploadFile
-
+from app.config import get_config
 from app.models.spaces_uploader import SpacesUploader
 from app.routers.DB_helpers.meta_token_db_reader import MetaTokenDbReader
 from app.models.schemas import OrganicPost, CarouselItem
-from app.models.fb_organic_poster import publish_mixed_media_bundle_facebook
+from app.models.fb_organic_poster import publish_mixed_media_bundle_post
 
 
 # IMPORTANT: FB-only imports (no IG endpoints)
 from app.models.fb_organic_poster import (
-    organic_posts,
-    upload_video_facebook,
-    publish_video_facebook,
-    upload_photo_facebook,
+    upload_video_post,
+    publish_video_post,
+    upload_photo_post,
     publish_photo_facebook,
-    upload_carousel_facebook,
-    publish_carousel_facebook,
+    upload_carousel_post,
+    publish_carousel_post,
 )
 
 # ---------------- CONFIG ----------------
@@ -32,9 +30,11 @@ DEFAULT_IMAGE_PATH = r"C:\Users\User\Pictures\example.jpg"
 DEFAULT_TITLE = "AI is changing everything 🤖"
 DEFAULT_LINK_URL = "https://example.com"  # required for FB carousel feed posts
 
-CLIENT_ID = os.environ["CLIENT_ID"]
-DATABASE_URL = os.environ["DATABASE_URL"]
-FERNET_KEY = os.environ["TOKEN_ENCRYPTION_KEY"]
+CFG = get_config()
+
+CLIENT_ID = CFG.client_id
+DATABASE_URL = CFG.database_url
+FERNET_KEY = CFG.fernet_key
 
 uploader = SpacesUploader()
 
@@ -74,31 +74,32 @@ def prompt_asset_type() -> str:
 
 
 
+_VIDEO_SUFFIXES = frozenset({".mp4", ".mov", ".m4v"})
+_IMAGE_SUFFIXES = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+
+
 def _ext_is_video(ext: str) -> bool:
-    return ext in {".mp4", ".mov", ".m4v"}
+    return ext in _VIDEO_SUFFIXES
 
 
 def _ext_is_image(ext: str) -> bool:
-    return ext in {".jpg", ".jpeg", ".png", ".webp"}
+    return ext in _IMAGE_SUFFIXES
 
 
 # ---------------- MAIN ----------------
 def main() -> None:
     reader = MetaTokenDbReader(database_url=DATABASE_URL, fernet_key=FERNET_KEY)
 
-    # ---------- Resolve page_id from DB ----------
-    meta_page = reader.get_latest_meta_page_for_client(CLIENT_ID)
+    # ---------- Resolve page_id (+ IG actor id) from DB in one query ----------
+    bundle = reader.get_latest_bundle_for_client(CLIENT_ID)
+    meta_page = bundle["meta_page"]
     page_id = (meta_page or {}).get("page_id")
     if not page_id:
         raise RuntimeError("No page_id found for this client in DB.")
 
     print("Resolved Facebook page_id:", page_id)
     # Optional sanity: compare with IG actor id (must be different)
-    try:
-        ig_actor = reader.get_instagram_actor_id_for_client(CLIENT_ID)
-        print("Resolved Instagram actor id (for sanity):", ig_actor)
-    except Exception:
-        pass
+    print("Resolved Instagram actor id (for sanity):", bundle["ig_actor_id"])
 
     # ---------- User input ----------
     title = prompt_str("Caption / Title", DEFAULT_TITLE)
@@ -112,29 +113,19 @@ def main() -> None:
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video not found: {video_path}")
 
-        with open(video_path, "rb") as f:
-            upload_file = UploadFile(filename=os.path.basename(video_path), file=f)
-
-            # Upload to Spaces to get a PUBLIC URL (required for Graph file_url)
-            video_url = uploader.upload_organic_video(
-                fileobj=upload_file.file,
-                filename=upload_file.filename,
-                content_type=upload_file.content_type or "video/mp4",
-            )
+        # Upload to Spaces to get a PUBLIC URL (required for Graph file_url)
+        video_url = uploader.upload_organic_from_path(video_path, kind="video")
 
         organic_post = OrganicPost(title=title, video_url=video_url)
         print(f"[spaces] Video URL: {organic_post.video_url}")
 
-        organic_posts.append(organic_post)
-        idx = len(organic_posts) - 1
-
         # HARD sanity: show exactly what is being called
-        print("CALLING:", upload_video_facebook.__module__, upload_video_facebook.__name__)
-        print("CALLING:", publish_video_facebook.__module__, publish_video_facebook.__name__)
+        print("CALLING:", upload_video_post.__module__, upload_video_post.__name__)
+        print("CALLING:", publish_video_post.__module__, publish_video_post.__name__)
 
         # FB-only: /{page_id}/videos (NOT IG /media)
-        upload_video_facebook(CLIENT_ID, str(page_id), idx, DATABASE_URL, FERNET_KEY)
-        publish_video_facebook(CLIENT_ID, str(page_id), idx, DATABASE_URL, FERNET_KEY)
+        upload_video_post(CLIENT_ID, str(page_id), organic_post, DATABASE_URL, FERNET_KEY)
+        publish_video_post(CLIENT_ID, str(page_id), organic_post, DATABASE_URL, FERNET_KEY)
 
     # ================= IMAGE =================
     elif asset_type == "image":
@@ -142,26 +133,16 @@ def main() -> None:
         if not os.path.exists(image_path):
             raise FileNotFoundError(f"Image not found: {image_path}")
 
-        with open(image_path, "rb") as f:
-            upload_file = UploadFile(filename=os.path.basename(image_path), file=f)
-
-            image_url = uploader.upload_organic_image(
-                fileobj=upload_file.file,
-                filename=upload_file.filename,
-                content_type=upload_file.content_type or "image/jpeg",
-            )
+        image_url = uploader.upload_organic_from_path(image_path, kind="image")
 
         organic_post = OrganicPost(title=title, image_url=image_url)
         print(f"[spaces] Image URL: {organic_post.image_url}")
 
-        organic_posts.append(organic_post)
-        idx = len(organic_posts) - 1
-
-        print("CALLING:", upload_photo_facebook.__module__, upload_photo_facebook.__name__)
+        print("CALLING:", upload_photo_post.__module__, upload_photo_post.__name__)
         print("CALLING:", publish_photo_facebook.__module__, publish_photo_facebook.__name__)
 
-        upload_photo_facebook(CLIENT_ID, str(page_id), idx, DATABASE_URL, FERNET_KEY)
-        publish_photo_facebook(CLIENT_ID, str(page_id), idx, DATABASE_URL, FERNET_KEY)
+        upload_photo_post(CLIENT_ID, str(page_id), organic_post, DATABASE_URL, FERNET_KEY)
+        publish_photo_facebook(CLIENT_ID, str(page_id), organic_post, DATABASE_URL, FERNET_KEY)
 
     # ================= CAROUSEL (IMAGES ONLY) =================
     elif asset_type == "carousel":
@@ -184,16 +165,9 @@ def main() -> None:
                 print("Unsupported file type for FB carousel. Use images only (.jpg/.png/.webp).")
                 continue
 
-            with open(path, "rb") as f:
-                upload_file = UploadFile(filename=os.path.basename(path), file=f)
-
-                url = uploader.upload_organic_image(
-                    fileobj=upload_file.file,
-                    filename=upload_file.filename,
-                    content_type=upload_file.content_type or "image/jpeg",
-                )
-                items.append(CarouselItem(type="image", url=url))
-                print(f"[spaces] Carousel image: {url}")
+            url = uploader.upload_organic_from_path(path, kind="image")
+            items.append(CarouselItem(type="image", url=url))
+            print(f"[spaces] Carousel image: {url}")
 
         if len(items) < 2:
             raise RuntimeError("Carousel requires at least 2 images.")
@@ -201,15 +175,13 @@ def main() -> None:
         link_url = prompt_str("Link URL for Facebook carousel post", DEFAULT_LINK_URL)
 
         organic_post = OrganicPost(title=title, carousel_items=items)
-        organic_posts.append(organic_post)
-        idx = len(organic_posts) - 1
 
-        print("CALLING:", upload_carousel_facebook.__module__, upload_carousel_facebook.__name__)
-        print("CALLING:", publish_carousel_facebook.__module__, publish_carousel_facebook.__name__)
+        print("CALLING:", upload_carousel_post.__module__, upload_carousel_post.__name__)
+        print("CALLING:", publish_carousel_post.__module__, publish_carousel_post.__name__)
 
         # publish step posts to /{page_id}/feed with is_published=true
-        upload_carousel_facebook(CLIENT_ID, str(page_id), idx, DATABASE_URL, FERNET_KEY, link_url=link_url)
-        publish_carousel_facebook(CLIENT_ID, str(page_id), idx, DATABASE_URL, FERNET_KEY)
+        upload_carousel_post(CLIENT_ID, str(page_id), organic_post, DATABASE_URL, FERNET_KEY, link_url=link_url)
+        publish_carousel_post(CLIENT_ID, str(page_id), organic_post, DATABASE_URL, FERNET_KEY)
 
     # ================= MIXED (IMAGES + VIDEOS) =================
     elif asset_type == "mixed":
@@ -232,39 +204,26 @@ def main() -> None:
                 print("Unsupported file type. Use .jpg/.png/.webp or .mp4/.mov/.m4v")
                 continue
 
-            with open(path, "rb") as f:
-                upload_file = UploadFile(filename=os.path.basename(path), file=f)
-
-                if _ext_is_video(ext):
-                    url = uploader.upload_organic_video(
-                        fileobj=upload_file.file,
-                        filename=upload_file.filename,
-                        content_type=upload_file.content_type or "video/mp4",
-                    )
-                    items.append(CarouselItem(type="video", url=url))
-                    print(f"[spaces] Mixed video: {url}")
-                else:
-                    url = uploader.upload_organic_image(
-                        fileobj=upload_file.file,
-                        filename=upload_file.filename,
-                        content_type=upload_file.content_type or "image/jpeg",
-                    )
-                    items.append(CarouselItem(type="image", url=url))
-                    print(f"[spaces] Mixed image: {url}")
+            if _ext_is_video(ext):
+                url = uploader.upload_organic_from_path(path, kind="video")
+                items.append(CarouselItem(type="video", url=url))
+                print(f"[spaces] Mixed video: {url}")
+            else:
+                url = uploader.upload_organic_from_path(path, kind="image")
+                items.append(CarouselItem(type="image", url=url))
+                print(f"[spaces] Mixed image: {url}")
 
         if len(items) < 2:
             raise RuntimeError("Mixed bundle requires at least 2 items total.")
 
         organic_post = OrganicPost(title=title, carousel_items=items)
-        organic_posts.append(organic_post)
-        idx = len(organic_posts) - 1
 
         print(
             "CALLING:",
-            publish_mixed_media_bundle_facebook.__module__,
-            publish_mixed_media_bundle_facebook.__name__,
+            publish_mixed_media_bundle_post.__module__,
+            publish_mixed_media_bundle_post.__name__,
         )
-        result = publish_mixed_media_bundle_facebook(CLIENT_ID, str(page_id), idx, DATABASE_URL, FERNET_KEY)
+        result = publish_mixed_media_bundle_post(CLIENT_ID, str(page_id), organic_post, DATABASE_URL, FERNET_KEY)
         print(result)
 
     else:
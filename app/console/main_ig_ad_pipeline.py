@@ -1,21 +1,48 @@
 # app/routers/main_ad_pipeline.py
 from __future__ import annotations
 
+import asyncio
+import atexit
+import io
+import logging
 import os
 import json
-import traceback
+import stat
+from functools import lru_cache
 from pathlib import Path
-import tempfile
+import threading
 import time
-from typing import Optional
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, NamedTuple, Optional, Sequence
 
+import httpx
 import requests
-from fastapi import UploadFile
 from dotenv import load_dotenv
 
-from app.models.ig_ads_stairway import AdsStairway
-from app.routers.DB_helpers.meta_token_db_reader import MetaTokenDbReader
-from app.models.spaces_uploader import SpacesUploader
+from app.config import get_config
+from app.console.json_dump import to_jsonable
+from app.console.pipeline_config import PipelineConfig
+from app.routers.DB_helpers.meta_token_db_reader import MetaTokenDbReader, shared_pool
+
+# Graph stairway + boto3 are imported where they're first used, so importing this module
+# for its helpers (normalize_link, is_image_path, ...) stays cheap
+if TYPE_CHECKING:
+    from app.models.ig_ads_stairway import AdsStairway
+    from app.models.spaces_uploader import SpacesUploader
+
+# Optional dependencies (graceful)
+try:
+    import orjson  # type: ignore
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+try:
+    import h2  # type: ignore  # noqa: F401  (httpx[http2])
+    HAS_H2 = True
+except Exception:
+    HAS_H2 = False
 
 load_dotenv()
 
@@ -23,75 +50,88 @@ load_dotenv()
 VIDEO_PATH = r"C:\Users\User\Desktop\Ig_Reels\istockphoto-2097298327-640_adpp_is.mp4"
 IMAGE_PATH = r"C:\Users\User\Pictures\example.jpg"
 
-CLIENT_ID = os.environ["CLIENT_ID"]
-GRAPH_API_VERSION = os.getenv("GRAPH_API_VERSION", "v17.0")
+CFG = get_config()
 
-DATABASE_URL = os.environ["DATABASE_URL"]
-FERNET_KEY = os.environ["TOKEN_ENCRYPTION_KEY"]
+CLIENT_ID = CFG.client_id
+GRAPH_API_VERSION = CFG.graph_api_version
+
+DATABASE_URL = CFG.database_url
+FERNET_KEY = CFG.fernet_key
 
 CAMPAIGN_NAME = "Automated IG Campaign_DB"
 OBJECTIVE = "OUTCOME_AWARENESS"
 INDEX = 0
 
-DEFAULT_LINK_URL = os.getenv("DEFAULT_AD_LINK_URL", "https://www.instagram.com/")
+DEFAULT_LINK_URL = CFG.default_ad_link_url or "https://www.instagram.com/"
 
 CAMPAIGN_STATUS = "ACTIVE"
 ADSET_STATUS = "ACTIVE"
 AD_STATUS = "ACTIVE"
 
+# PIPELINE_DEBUG=1 runs the step log at DEBUG: full step responses + dbg() dumps
+LOG_LEVEL = logging.DEBUG if CFG.pipeline_debug else logging.INFO
 
-# ---------------- HELPERS ----------------
-def _to_jsonable(obj):
-    if obj is None:
-        return None
-    if isinstance(obj, (str, int, float, bool)):
-        return obj
-    if isinstance(obj, (list, tuple)):
-        return [_to_jsonable(x) for x in obj]
-    if isinstance(obj, dict):
-        return {str(k): _to_jsonable(v) for k, v in obj.items()}
-    if hasattr(obj, "model_dump"):
-        try:
-            return obj.model_dump()
-        except Exception:
-            pass
-    if hasattr(obj, "dict"):
-        try:
-            return obj.dict()
-        except Exception:
-            pass
-    if hasattr(obj, "__dict__"):
-        try:
-            return {k: _to_jsonable(v) for k, v in obj.__dict__.items() if not k.startswith("_")}
-        except Exception:
-            pass
-    return repr(obj)
 
+# ---------------- STEP LOG ----------------
+logger = logging.getLogger("ig_ad_pipeline")
 
-def dbg(tag: str, payload) -> None:
-    try:
-        print(f"\n[PIPELINE DBG] {tag}")
-        print(json.dumps(_to_jsonable(payload), indent=2, ensure_ascii=False))
-        print("[/PIPELINE DBG]\n")
-    except Exception:
-        print(f"\n[PIPELINE DBG] {tag}: {payload!r}\n[/PIPELINE DBG]\n")
 
+class _JsonLineFormatter(logging.Formatter):
+    """
+    One JSON object per line: ts, level, event + the run's bound fields (client_id, run_id, step...).
+    Field values (Graph responses, models) are only serialized here, i.e. when a handler emits the line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+            **getattr(record, "ctx", {}),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        if HAS_ORJSON:
+            return orjson.dumps(entry, default=to_jsonable, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        return json.dumps(to_jsonable(entry), ensure_ascii=False, default=str)
 
-def log_response(step: str, resp) -> None:
-    print(f"\n---- {step} RESPONSE ----")
-    try:
-        print(json.dumps(_to_jsonable(resp), indent=2, ensure_ascii=False))
-    except Exception:
-        print(repr(resp))
-    print("---- END RESPONSE ----\n")
 
+class _RunLogger(logging.LoggerAdapter):
+    """Binds client_id/run_id to every line; per-call fields go in fields={...}."""
 
-def log_error(step: str, e: Exception) -> None:
-    print(f"\n!!!! {step} FAILED !!!!")
-    print(f"{type(e).__name__}: {e}")
-    print("\n[traceback]")
-    traceback.print_exc()
-    print("!!!! END ERROR !!!!\n")
+    def process(self, msg, kwargs):
+        kwargs["extra"] = {"ctx": {**self.extra, **(kwargs.pop("fields", None) or {})}}
+        return msg, kwargs
+
+
+# lines logged outside a run (no client_id/run_id bound)
+_NO_RUN = _RunLogger(logger, {})
+
+
+def configure_logging(level: int = LOG_LEVEL) -> None:
+    # console entry point only: when imported by a service, its own logging config applies
+    handler = logging.StreamHandler()
+    handler.setFormatter(_JsonLineFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def dbg(log: logging.LoggerAdapter, tag: str, payload) -> None:
+    log.debug(tag, fields={"payload": payload})
+
+
+def log_response(log: logging.LoggerAdapter, step: str, resp) -> None:
+    # full response at DEBUG; otherwise a one-line ack
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(step, fields={"response": resp})
+    else:
+        log.info(f"[ok] {step}")
+
+
+def log_error(log: logging.LoggerAdapter, step: str, e: Exception) -> None:
+    # exception summary + traceback (the formatter's "exc" field)
+    log.error(f"[FAILED] {step}", exc_info=e, fields={"error": f"{type(e).__name__}: {e}"})
 
 
 def choose_asset_mode_console() -> str:
@@ -145,12 +185,57 @@ def normalize_link(link: str) -> str:
     return "https://" + l
 
 
+_IMAGE_SUFFIXES = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+_VIDEO_SUFFIXES = frozenset({".mp4", ".mov", ".m4v"})
+
+
 def is_image_path(p: Path) -> bool:
-    return p.suffix.lower() in {".jpg", ".jpeg", ".png", ".webp"}
+    return p.suffix.lower() in _IMAGE_SUFFIXES
 
 
 def is_video_path(p: Path) -> bool:
-    return p.suffix.lower() in {".mp4", ".mov", ".m4v"}
+    return p.suffix.lower() in _VIDEO_SUFFIXES
+
+
+class MediaItem(NamedTuple):
+    path: Path
+    suffix: str
+    size: int
+    is_video: bool
+
+
+def _stat_file(path: str) -> Optional[os.stat_result]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st if stat.S_ISREG(st.st_mode) else None
+
+
+def _validate_carousel_paths(raw_paths: Sequence[str], *, allow_video: bool) -> list[MediaItem]:
+    """
+    One stat + one suffix lookup per item; the cards then dispatch on item.is_video.
+    Paths are stat'ed in parallel (slow on SMB/NFS mounts when done one by one).
+    """
+    if len(raw_paths) < 2:
+        stats = [_stat_file(p) for p in raw_paths]
+    else:
+        with ThreadPoolExecutor(max_workers=min(8, len(raw_paths))) as ex:
+            stats = list(ex.map(_stat_file, raw_paths))
+
+    items: list[MediaItem] = []
+    for p, st in zip(raw_paths, stats):
+        if st is None:
+            raise FileNotFoundError(f"Carousel {'item' if allow_video else 'image'} not found: {p}")
+        pp = Path(p)
+        suffix = pp.suffix.lower()
+        is_video = suffix in _VIDEO_SUFFIXES
+        if suffix not in _IMAGE_SUFFIXES and not (allow_video and is_video):
+            if allow_video:
+                raise ValueError(f"Unsupported carousel item type (image/video only): {p}")
+            raise ValueError(f"Carousel images only. Not an image: {p}")
+        items.append(MediaItem(pp, suffix, st.st_size, is_video))
+    return items
 
 
 def prompt_carousel_paths(allow_video: bool) -> list[str]:
@@ -174,7 +259,50 @@ def prompt_carousel_paths(allow_video: bool) -> list[str]:
     return paths
 
 
+# ---------------- RUN CONFIG ----------------
+_CONFIG_DEFAULTS = {"link": "youtube.com", "video_path": VIDEO_PATH, "image_path": IMAGE_PATH}
+
+
+def config_from_prompts() -> PipelineConfig:
+    """Legacy console flow: same questions, asked up front."""
+    daily_budget = prompt_int(1000, "Daily budget")
+    title = prompt_text("Check this out!", "Ad title")
+    link = prompt_text(_CONFIG_DEFAULTS["link"], "Redirect link")
+    mode = choose_asset_mode_console()
+
+    video_path, image_path, carousel_paths = VIDEO_PATH, IMAGE_PATH, []
+    if mode == "video":
+        video_path = prompt_path(VIDEO_PATH, "Video")
+    elif mode == "image":
+        image_path = prompt_path(IMAGE_PATH, "Image")
+    else:
+        carousel_paths = prompt_carousel_paths(allow_video=(mode == "carousel_mixed"))
+
+    return PipelineConfig(
+        mode=mode,
+        daily_budget=daily_budget,
+        title=title,
+        link=link,
+        video_path=video_path,
+        image_path=image_path,
+        carousel_paths=carousel_paths,
+    )
+
+
 # ---------------- FIX: robust thumbnail download ----------------
+# One pooled client for thumbnail downloads: every card after the first reuses the CDN connection
+_HTTP = httpx.Client(http2=HAS_H2, timeout=30.0, follow_redirects=True)
+atexit.register(_HTTP.close)
+
+
+def _graph_session() -> requests.Session:
+    # Graph keep-alive pool for this run, sized for the concurrent carousel card uploads;
+    # same factory (and 429/5xx GET retry policy) as the stairway's shared SESSION
+    from app.models.graph_http import graph_session
+
+    return graph_session(pool_connections=16, pool_maxsize=16)
+
+
 def _guess_suffix_from_url(url: str, default: str = ".jpg") -> str:
     u = (url or "").lower()
     if ".png" in u:
@@ -186,68 +314,56 @@ def _guess_suffix_from_url(url: str, default: str = ".jpg") -> str:
     return default
 
 
-def download_url_to_tempfile(
+def download_url_to_buffer(
     url: str,
     *,
-    suffix: Optional[str] = None,
     retries: int = 4,
     timeout_s: int = 30,
     backoff_s: float = 1.25,
-) -> str:
+    log: logging.LoggerAdapter = _NO_RUN,
+) -> io.BytesIO:
     """
     Replaces urllib.request.urlretrieve which can throw ContentTooShortError on flaky networks / CDNs.
-    - Streams the response to disk
+    - Streams the response into memory (thumbnails are small: no temp file to create / clean up)
     - Verifies Content-Length (when provided)
     - Retries with exponential-ish backoff
+    Returns the buffer rewound to 0, ready for ads.upload_ad_image_fileobj.
     """
     if not url:
-        raise ValueError("download_url_to_tempfile: url is empty")
+        raise ValueError("download_url_to_buffer: url is empty")
 
-    suffix = suffix or _guess_suffix_from_url(url, default=".jpg")
+    headers = {
+        # helps some CDNs that behave differently for unknown clients
+        "User-Agent": "Mozilla/5.0",
+        "Accept": "*/*",
+    }
 
     last_err: Exception | None = None
     for attempt in range(1, retries + 1):
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-        tmp_path = tmp.name
-        tmp.close()
-
+        buf = io.BytesIO()
         try:
-            headers = {
-                # helps some CDNs that behave differently for unknown clients
-                "User-Agent": "Mozilla/5.0",
-                "Accept": "*/*",
-            }
-
-            with requests.get(url, stream=True, timeout=timeout_s, headers=headers) as r:
+            with _HTTP.stream("GET", url, timeout=timeout_s, headers=headers) as r:
                 r.raise_for_status()
                 expected = r.headers.get("Content-Length")
                 expected_n = int(expected) if expected and expected.isdigit() else None
 
-                total = 0
-                with open(tmp_path, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=1024 * 256):
-                        if not chunk:
-                            continue
-                        f.write(chunk)
-                        total += len(chunk)
+                for chunk in r.iter_bytes(chunk_size=1024 * 256):
+                    if chunk:
+                        buf.write(chunk)
 
             # if server provided length, validate
+            total = buf.tell()
             if expected_n is not None and total != expected_n:
                 raise IOError(f"retrieval incomplete: got {total} out of {expected_n} bytes")
 
-            return tmp_path
+            buf.seek(0)
+            return buf
 
         except Exception as e:
             last_err = e
-            # cleanup partial file
-            try:
-                os.unlink(tmp_path)
-            except Exception:
-                pass
-
             if attempt < retries:
                 sleep_s = backoff_s * attempt
-                dbg("thumb.download.retry", {"attempt": attempt, "sleep_s": sleep_s, "error": repr(e)})
+                dbg(log, "thumb.download.retry", {"attempt": attempt, "sleep_s": sleep_s, "error": repr(e)})
                 time.sleep(sleep_s)
                 continue
 
@@ -257,24 +373,179 @@ def download_url_to_tempfile(
     raise last_err or RuntimeError("download failed")
 
 
+# ---------------- CLIENT META (TTL cache) ----------------
+# meta_user / meta_page / ig_actor_id change rarely: one DB trip per client per TTL window
+_CLIENT_META_TTL_S = 300.0
+_CLIENT_META_CACHE: dict[str, tuple[float, tuple]] = {}
+_CLIENT_META_LOCK = threading.Lock()
+
+
+def _load_client_meta(reader: MetaTokenDbReader, client_id: str) -> tuple:
+    """(meta_user, meta_page, ig_actor_id) for client_id, cached for _CLIENT_META_TTL_S."""
+    now = time.monotonic()
+    with _CLIENT_META_LOCK:
+        hit = _CLIENT_META_CACHE.get(client_id)
+    if hit is not None and hit[0] > now:
+        return hit[1]
+
+    bundle = reader.get_latest_bundle_for_client(client_id)  # one query instead of three
+    value = (bundle["meta_user"], bundle["meta_page"], bundle["ig_actor_id"])
+    # only cache complete rows: a missing link should be picked up as soon as it's fixed
+    if all(value):
+        with _CLIENT_META_LOCK:
+            _CLIENT_META_CACHE[client_id] = (now + _CLIENT_META_TTL_S, value)
+    return value
+
+
+def _forget_client_meta(client_id: str) -> None:
+    # called when Graph rejects the ids/token, so the next run re-reads the DB
+    with _CLIENT_META_LOCK:
+        _CLIENT_META_CACHE.pop(client_id, None)
+
+
+# ---------------- MIXED CAROUSEL CARDS ----------------
+# carousel cards uploading at once
+CAROUSEL_UPLOAD_CONCURRENCY = 6
+
+# work that main() starts early and joins in a later step
+_BACKGROUND = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pipeline-bg")
+atexit.register(_BACKGROUND.shutdown, wait=False, cancel_futures=True)
+
+# thumbnail download + /adimages upload, run next to each card's video upload
+_THUMB_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="carousel-thumb")
+atexit.register(_THUMB_POOL.shutdown, wait=False)
+
+
+def _upload_thumbnail(log: logging.LoggerAdapter, ads: AdsStairway, i: int, thumb_url: str) -> str:
+    # FIXED: robust download (no urllib ContentTooShortError), kept in memory
+    thumb_buf = download_url_to_buffer(thumb_url, log=log)
+    thumb_name = f"thumb_{i}{_guess_suffix_from_url(thumb_url, default='.jpg')}"
+    return ads.upload_ad_image_fileobj(adset_index=INDEX, fileobj=thumb_buf, filename=thumb_name)
+
+
+def _process_carousel_card(
+    log: logging.LoggerAdapter,
+    ads: AdsStairway,
+    spaces: SpacesUploader,
+    i: int,
+    item: MediaItem,
+    final_link: str,
+) -> dict:
+    """One carousel card (blocking): image -> image_hash, or video -> Spaces -> Meta video_id + thumb hash."""
+    p = item.path
+    if not item.is_video:
+        # repeated files are uploaded once: upload_ad_image dedups by content per ad account
+        h = ads.upload_ad_image(adset_index=INDEX, image_path=str(p))
+        child = {"name": f"Card {i}", "link": final_link, "image_hash": h}
+        dbg(log, "CAROUSEL_CHILD_ADD_IMAGE", {"i": i, "path": str(p), "image_hash": h, "new_child": child})
+        return child
+
+    # video -> Spaces upload -> hosted URL -> Meta upload -> thumbnail download -> upload thumb -> image_hash
+    media = spaces.save_ad_media_from_path(p)
+
+    video_url = media.get("video_url")
+    thumb_url = media.get("thumbnail_url")
+    if not video_url:
+        raise RuntimeError("No video_url from spaces.save_ad_media")
+    if not thumb_url:
+        raise RuntimeError("No thumbnail_url from spaces.save_ad_media")
+
+    # the thumbnail and the video only depend on the Spaces URLs: upload them side by side
+    thumb_future = _THUMB_POOL.submit(_upload_thumbnail, log, ads, i, thumb_url)
+    vid = ads.upload_ad_video(adset_index=INDEX, video_url=video_url)
+    thumb_hash = thumb_future.result()
+
+    child = {"name": f"Card {i}", "link": final_link, "video_id": vid, "image_hash": thumb_hash}
+    dbg(
+        log,
+        "CAROUSEL_CHILD_ADD_VIDEO",
+        {"i": i, "path": str(p), "video_id": vid, "thumb_hash": thumb_hash, "new_child": child},
+    )
+    return child
+
+
+async def _process_carousel_cards(
+    log: logging.LoggerAdapter,
+    ads: AdsStairway,
+    spaces: SpacesUploader,
+    items: list[MediaItem],
+    final_link: str,
+) -> list[dict]:
+    # every step is blocking HTTP: one worker thread per card, gather keeps input order;
+    # the semaphore caps cards in flight (Meta throttles uploads per ad account)
+    sem = asyncio.Semaphore(CAROUSEL_UPLOAD_CONCURRENCY)
+
+    async def one(i: int, item: MediaItem) -> dict:
+        async with sem:
+            return await asyncio.to_thread(_process_carousel_card, log, ads, spaces, i, item, final_link)
+
+    return list(await asyncio.gather(*(one(i, item) for i, item in enumerate(items, start=1))))
+
+
+# ---------------- SHARED CLIENTS ----------------
+# Built once per process: main() can be called repeatedly (service mode) without
+# re-creating the boto3 client / crypto helpers. AdsStairway stays per run: it keeps
+# the run's campaigns/adsets by index (INDEX) and must start empty.
+@lru_cache(maxsize=1)
+def _get_reader() -> MetaTokenDbReader:
+    # pooled: the client bundle query and AdsStairway's token lookups share warm connections
+    return MetaTokenDbReader(database_url=DATABASE_URL, fernet_key=FERNET_KEY, pool=shared_pool(DATABASE_URL))
+
+
+@lru_cache(maxsize=1)
+def _get_spaces() -> SpacesUploader:
+    from app.models.spaces_uploader import SpacesUploader
+
+    return SpacesUploader()
+
+
+def _discard_staged_media(log: logging.LoggerAdapter, spaces: SpacesUploader, staged: Optional[Future]) -> None:
+    """
+    Error path: stop the background Spaces upload, or delete its objects once it lands.
+    A cache hit is not ours to delete (another run may still be using it): discard_ad_media skips it.
+    """
+    if staged is None or staged.cancel():
+        return
+    try:
+        media = staged.result()
+    except Exception:
+        return  # the upload itself failed: nothing was staged
+    try:
+        spaces.discard_ad_media(media)
+    except Exception as e:
+        log_error(log, "discard staged media", e)
+
+
 # ---------------- MAIN ----------------
-def main() -> None:
-    reader = MetaTokenDbReader(database_url=DATABASE_URL, fernet_key=FERNET_KEY)
+def main(config: Optional[PipelineConfig] = None) -> None:
+    """
+    config=None reads the command line (PipelineConfig.from_args) and, without --mode/--config,
+    asks on stdin after STEP 1 like before. Pass a config to run without touching stdin.
+    """
+    if config is None:
+        config = PipelineConfig.from_args(
+            description="Create a paid Instagram ad end to end.", defaults=_CONFIG_DEFAULTS
+        )
+
+    from app.models.ig_ads_stairway import AdsStairway
+
+    log = _RunLogger(logger, {"client_id": CLIENT_ID, "run_id": uuid.uuid4().hex})
+
+    reader = _get_reader()
 
-    meta_user = reader.get_latest_meta_user_for_client(CLIENT_ID)
-    log_response("DB meta_user (latest)", meta_user)
+    meta_user, meta_page, ig_actor_id = _load_client_meta(reader, CLIENT_ID)
+
+    log_response(log, "DB meta_user (latest)", meta_user)
     meta_user_id = (meta_user or {}).get("meta_user_id")
     if not meta_user_id:
         raise RuntimeError("No meta_user_id found for this client in DB (meta_user table).")
 
-    meta_page = reader.get_latest_meta_page_for_client(CLIENT_ID)
-    log_response("DB meta_page (latest)", meta_page)
+    log_response(log, "DB meta_page (latest)", meta_page)
     page_id = (meta_page or {}).get("page_id")
     if not page_id:
         raise RuntimeError("No page_id found for this client in DB (meta_page table).")
 
-    ig_actor_id = reader.get_instagram_actor_id_for_client(CLIENT_ID)
-    log_response("DB instagram_actor_id (latest)", {"ig_actor_id": ig_actor_id})
+    log_response(log, "DB instagram_actor_id (latest)", {"ig_actor_id": ig_actor_id})
     if not ig_actor_id:
         raise RuntimeError(
             "No Instagram account linked to this client in DB (instagram_account table). "
@@ -289,50 +560,59 @@ def main() -> None:
         page_id=str(page_id),
         instagram_actor_id=str(ig_actor_id),
         graph_version=GRAPH_API_VERSION,
+        http_session=_graph_session(),
+        reader=reader,
     )
 
-    spaces = SpacesUploader()
+    spaces = _get_spaces()
 
     # STEP 1
     try:
-        print("STEP 1: Fetch ad accounts & generate campaigns")
+        log.info("STEP 1: Fetch ad accounts & generate campaigns", fields={"step": "1"})
         info = ads.get_ad_accounts(campaign_name=CAMPAIGN_NAME, objective=OBJECTIVE)
-        log_response("STEP 1 get_ad_accounts()", info)
+        log_response(log, "STEP 1 get_ad_accounts()", info)
     except Exception as e:
-        log_error("STEP 1", e)
+        _forget_client_meta(CLIENT_ID)
+        log_error(log, "STEP 1", e)
         return
 
-    # STEP 2
-    try:
-        print("STEP 2: Create campaign")
-        campaign = ads.create_campaign_by_index(INDEX, status=CAMPAIGN_STATUS)
-        log_response("STEP 2 create_campaign_by_index()", campaign)
-    except Exception as e:
-        log_error("STEP 2", e)
-        return
+    if config is None:
+        config = config_from_prompts()
 
-    daily_budget = prompt_int(1000, "Daily budget")
-    title = prompt_text("Check this out!", "Ad title")
-    link = prompt_text("youtube.com", "Redirect link")
-    final_link = normalize_link(link)
+    daily_budget = config.daily_budget
+    title = config.title
+    final_link = normalize_link(config.link)
 
-    mode = choose_asset_mode_console()
+    mode = config.mode
     asset_type = "video" if mode == "video" else "image"
-    log_response("CHOICE asset_type", {"mode": mode, "asset_type": asset_type})
+    log_response(log, "CHOICE asset_type", {"mode": mode, "asset_type": asset_type})
+
+    # The Spaces upload only needs the local file, not the campaign/adset:
+    # start it now so it overlaps STEP 2+3, and join it in STEP 5.
+    staged_media: Optional[Future] = None
+    if mode == "video" and os.path.isfile(config.video_path):
+        staged_media = _BACKGROUND.submit(spaces.save_ad_media_from_path, Path(config.video_path))
 
-    # STEP 3
+    # STEP 2 + 3 (one Graph batch request)
     try:
-        print("STEP 3: Create adset")
-        adset = ads.create_adset(INDEX, status=ADSET_STATUS, asset_type=asset_type)
+        log.info("STEP 2+3: Create campaign + adset", fields={"step": "2+3"})
+        campaign, adset = ads.create_campaign_and_adset(
+            INDEX,
+            campaign_status=CAMPAIGN_STATUS,
+            adset_status=ADSET_STATUS,
+            asset_type=asset_type,
+        )
+        log_response(log, "STEP 2 create_campaign_and_adset() campaign", campaign)
 
         adset.daily_budget = int(daily_budget)
         adset.title = str(title)
         adset.link = str(final_link)
 
-        log_response("STEP 3 create_adset()", adset)
-        dbg("ADSET_AFTER_MUTATION", adset)
+        log_response(log, "STEP 3 create_adset()", adset)
+        dbg(log, "ADSET_AFTER_MUTATION", adset)
     except Exception as e:
-        log_error("STEP 3", e)
+        log_error(log, "STEP 2+3", e)
+        _discard_staged_media(log, spaces, staged_media)
         return
 
     # =========================
@@ -340,50 +620,52 @@ def main() -> None:
     # =========================
     if mode == "video":
         try:
-            chosen_video_path = prompt_path(VIDEO_PATH, "Video")
+            chosen_video_path = config.video_path
             video_path = Path(chosen_video_path)
             if not video_path.exists():
                 raise FileNotFoundError(f"Video not found at {chosen_video_path}")
-            print("STEP 4: Load video file")
-            log_response("STEP 4 video_path", {"path": str(video_path), "size_bytes": video_path.stat().st_size})
+            log.info("STEP 4: Load video file", fields={"step": "4"})
+            log_response(log, "STEP 4 video_path", {"path": str(video_path), "size_bytes": video_path.stat().st_size})
         except Exception as e:
-            log_error("STEP 4", e)
+            log_error(log, "STEP 4", e)
+            _discard_staged_media(log, spaces, staged_media)
             return
 
         try:
-            print("STEP 5: Save video + generate Spaces URLs")
-            with open(video_path, "rb") as f:
-                upload_file = UploadFile(filename=video_path.name, file=f)
-                media = spaces.save_ad_media(upload_file)
-            log_response("STEP 5 spaces.save_ad_media()", media)
+            log.info("STEP 5: Save video + generate Spaces URLs", fields={"step": "5"})
+            if staged_media is not None:
+                media = staged_media.result()
+            else:
+                media = spaces.save_ad_media_from_path(video_path)
+            log_response(log, "STEP 5 spaces.save_ad_media()", media)
 
             video_url = media.get("video_url")
             thumbnail_url = media.get("thumbnail_url") or ""
             if not video_url:
                 raise ValueError("Spaces video_url not returned correctly")
         except Exception as e:
-            log_error("STEP 5", e)
+            log_error(log, "STEP 5", e)
             return
 
         try:
-            print("STEP 6: Upload video to Meta (hosted URL)")
+            log.info("STEP 6: Upload video to Meta (hosted URL)", fields={"step": "6"})
             vid = ads.upload_ad_video(adset_index=INDEX, video_url=video_url)
-            log_response("STEP 6 upload_ad_video()", {"video_id": vid})
+            log_response(log, "STEP 6 upload_ad_video()", {"video_id": vid})
         except Exception as e:
-            log_error("STEP 6", e)
+            log_error(log, "STEP 6", e)
             return
 
         try:
-            print("STEP 7: Create IG video ad creative + paid ad")
+            log.info("STEP 7: Create IG video ad creative + paid ad", fields={"step": "7"})
             ad_result = ads.create_paid_ig_ad(
                 adset_index=INDEX,
                 ad_name=title,
                 thumbnail_url=thumbnail_url,
                 status=AD_STATUS,
             )
-            log_response("STEP 7 create_paid_ig_ad()", ad_result)
+            log_response(log, "STEP 7 create_paid_ig_ad()", ad_result)
         except Exception as e:
-            log_error("STEP 7", e)
+            log_error(log, "STEP 7", e)
             return
 
     # =========================
@@ -391,37 +673,37 @@ def main() -> None:
     # =========================
     elif mode == "image":
         try:
-            chosen_image_path = prompt_path(IMAGE_PATH, "Image")
+            chosen_image_path = config.image_path
             image_path = Path(chosen_image_path)
             if not image_path.exists():
                 raise FileNotFoundError(f"Image not found at {chosen_image_path}")
             if not is_image_path(image_path):
                 raise ValueError("Please provide an image file (.jpg/.png/.webp)")
-            print("STEP 4: Load image file")
-            log_response("STEP 4 image_path", {"path": str(image_path), "size_bytes": image_path.stat().st_size})
+            log.info("STEP 4: Load image file", fields={"step": "4"})
+            log_response(log, "STEP 4 image_path", {"path": str(image_path), "size_bytes": image_path.stat().st_size})
         except Exception as e:
-            log_error("STEP 4", e)
+            log_error(log, "STEP 4", e)
             return
 
         try:
-            print("STEP 5: Upload image to Meta (multipart local file)")
+            log.info("STEP 5: Upload image to Meta (multipart local file)", fields={"step": "5"})
             image_hash = ads.upload_ad_image(adset_index=INDEX, image_path=str(image_path))
-            log_response("STEP 5 upload_ad_image()", {"image_hash": image_hash})
+            log_response(log, "STEP 5 upload_ad_image()", {"image_hash": image_hash})
         except Exception as e:
-            log_error("STEP 5", e)
+            log_error(log, "STEP 5", e)
             return
 
         try:
-            print("STEP 6: Create IG image ad creative + paid ad")
+            log.info("STEP 6: Create IG image ad creative + paid ad", fields={"step": "6"})
             ad_result = ads.create_paid_ig_image_ad(
                 adset_index=INDEX,
                 ad_name=title,
                 status=AD_STATUS,
                 link_url=final_link,
             )
-            log_response("STEP 6 create_paid_ig_image_ad()", ad_result)
+            log_response(log, "STEP 6 create_paid_ig_image_ad()", ad_result)
         except Exception as e:
-            log_error("STEP 6", e)
+            log_error(log, "STEP 6", e)
             return
 
     # =========================
@@ -429,38 +711,31 @@ def main() -> None:
     # =========================
     elif mode == "carousel_images":
         try:
-            raw_paths = prompt_carousel_paths(allow_video=False)
-            valid_image_paths: list[Path] = []
-            for p in raw_paths:
-                pp = Path(p)
-                if not pp.exists():
-                    raise FileNotFoundError(f"Carousel image not found: {p}")
-                if not is_image_path(pp):
-                    raise ValueError(f"Carousel images only. Not an image: {p}")
-                valid_image_paths.append(pp)
-
-            log_response("STEP 4 carousel_paths", [str(p) for p in valid_image_paths])
-            dbg("CAROUSEL_IMAGE_PATHS", [str(p) for p in valid_image_paths])
+            image_items = _validate_carousel_paths(config.carousel_paths, allow_video=False)
+            log_response(log, "STEP 4 carousel_paths", [str(it.path) for it in image_items])
+            dbg(log, "CAROUSEL_IMAGE_PATHS", [{"path": str(it.path), "size_bytes": it.size} for it in image_items])
         except Exception as e:
-            log_error("STEP 4", e)
+            log_error(log, "STEP 4", e)
             return
 
         try:
-            print("STEP 5: Upload carousel images to Meta (multipart local files)")
-            hashes = ads.upload_ad_images(adset_index=INDEX, image_paths=[str(p) for p in valid_image_paths])
-            log_response("STEP 5 carousel_image_hashes", hashes)
-            dbg("CAROUSEL_IMAGE_HASHES_FINAL", hashes)
+            log.info("STEP 5: Upload carousel images to Meta (one Graph batch)", fields={"step": "5"})
+            hashes = ads.upload_ad_images_batch(adset_index=INDEX, image_paths=[str(it.path) for it in image_items])
+            log_response(log, "STEP 5 carousel_image_hashes", hashes)
+            dbg(log, "CAROUSEL_IMAGE_HASHES_FINAL", hashes)
         except Exception as e:
-            log_error("STEP 5", e)
+            log_error(log, "STEP 5", e)
             return
 
         try:
-            print("STEP 6: Create IG carousel ad creative + paid ad")
-            child_attachments = [
-                {"name": f"Card {i}", "link": final_link, "image_hash": h}
-                for i, h in enumerate(hashes, start=1)
-            ]
-            dbg("CAROUSEL_CREATE_INPUT", {"child_attachments": child_attachments, "link_url": final_link})
+            log.info("STEP 6: Create IG carousel ad creative + paid ad", fields={"step": "6"})
+            if log.isEnabledFor(logging.DEBUG):
+                # only for the dump: the homogeneous carousel is built from the hashes alone
+                child_attachments = [
+                    {"name": f"Card {i}", "link": final_link, "image_hash": h}
+                    for i, h in enumerate(hashes, start=1)
+                ]
+                dbg(log, "CAROUSEL_CREATE_INPUT", {"child_attachments": child_attachments, "link_url": final_link})
 
             ad_result = ads.create_paid_ig_homogeneous_carousel_ad(
                 adset_index=INDEX,
@@ -469,9 +744,9 @@ def main() -> None:
                 status=AD_STATUS,
                 link_url=final_link,
             )
-            log_response("STEP 6 create_paid_ig_homogeneous_carousel_ad()", ad_result)
+            log_response(log, "STEP 6 create_paid_ig_homogeneous_carousel_ad()", ad_result)
         except Exception as e:
-            log_error("STEP 6", e)
+            log_error(log, "STEP 6", e)
             return
 
     # =========================
@@ -479,83 +754,29 @@ def main() -> None:
     # =========================
     else:
         try:
-            raw_paths = prompt_carousel_paths(allow_video=True)
-            valid_media_paths: list[Path] = []
-            for p in raw_paths:
-                pp = Path(p)
-                if not pp.exists():
-                    raise FileNotFoundError(f"Carousel item not found: {p}")
-                if not (is_image_path(pp) or is_video_path(pp)):
-                    raise ValueError(f"Unsupported carousel item type (image/video only): {p}")
-                valid_media_paths.append(pp)
-            log_response("STEP 4 carousel_media_paths", [str(p) for p in valid_media_paths])
-            dbg("CAROUSEL_MEDIA_PATHS", [str(p) for p in valid_media_paths])
+            media_items = _validate_carousel_paths(config.carousel_paths, allow_video=True)
+            log_response(log, "STEP 4 carousel_media_paths", [str(it.path) for it in media_items])
+            dbg(log, "CAROUSEL_MEDIA_PATHS", [{"path": str(it.path), "size_bytes": it.size} for it in media_items])
         except Exception as e:
-            log_error("STEP 4", e)
+            log_error(log, "STEP 4", e)
             return
 
         try:
-            print("STEP 5: Upload carousel media (images + video)")
-            child_attachments: list[dict] = []
-
-            for i, p in enumerate(valid_media_paths, start=1):
-                if is_image_path(p):
-                    h = ads.upload_ad_image(adset_index=INDEX, image_path=str(p))
-                    child_attachments.append({"name": f"Card {i}", "link": final_link, "image_hash": h})
-                    dbg(
-                        "CAROUSEL_CHILD_ADD_IMAGE",
-                        {"i": i, "path": str(p), "image_hash": h, "child_attachments": child_attachments},
-                    )
-                else:
-                    # video -> Spaces upload -> hosted URL -> Meta upload -> thumbnail download -> upload thumb -> image_hash
-                    with open(p, "rb") as f:
-                        upload_file = UploadFile(filename=p.name, file=f)
-                        media = spaces.save_ad_media(upload_file)
-
-                    video_url = media.get("video_url")
-                    thumb_url = media.get("thumbnail_url")
-                    if not video_url:
-                        raise RuntimeError("No video_url from spaces.save_ad_media")
-                    if not thumb_url:
-                        raise RuntimeError("No thumbnail_url from spaces.save_ad_media")
-
-                    vid = ads.upload_ad_video(adset_index=INDEX, video_url=video_url)
-
-                    # FIXED: robust download (no urllib ContentTooShortError)
-                    thumb_tmp_path = download_url_to_tempfile(thumb_url, suffix=".jpg")
-
-                    try:
-                        thumb_hash = ads.upload_ad_image(adset_index=INDEX, image_path=thumb_tmp_path)
-                    finally:
-                        # cleanup temp thumbnail
-                        try:
-                            os.unlink(thumb_tmp_path)
-                        except Exception:
-                            pass
-
-                    child_attachments.append(
-                        {"name": f"Card {i}", "link": final_link, "video_id": vid, "image_hash": thumb_hash}
-                    )
-                    dbg(
-                        "CAROUSEL_CHILD_ADD_VIDEO",
-                        {
-                            "i": i,
-                            "path": str(p),
-                            "video_id": vid,
-                            "thumb_hash": thumb_hash,
-                            "child_attachments": child_attachments,
-                        },
-                    )
-
-            log_response("STEP 5 child_attachments", child_attachments)
-            dbg("CAROUSEL_CHILD_ATTACHMENTS_FINAL", child_attachments)
+            log.info("STEP 5: Upload carousel media (images + video)", fields={"step": "5"})
+            # cards are independent: upload them concurrently, keep card order
+            child_attachments = asyncio.run(
+                _process_carousel_cards(log, ads, spaces, media_items, final_link)
+            )
+
+            log_response(log, "STEP 5 child_attachments", child_attachments)
+            dbg(log, "CAROUSEL_CHILD_ATTACHMENTS_FINAL", child_attachments)
         except Exception as e:
-            log_error("STEP 5", e)
+            log_error(log, "STEP 5", e)
             return
 
         try:
-            print("STEP 6: Create IG mixed carousel creative + paid ad")
-            dbg("CAROUSEL_MIXED_CREATE_INPUT", {"child_attachments": child_attachments, "link_url": final_link})
+            log.info("STEP 6: Create IG mixed carousel creative + paid ad", fields={"step": "6"})
+            dbg(log, "CAROUSEL_MIXED_CREATE_INPUT", {"child_attachments": child_attachments, "link_url": final_link})
 
             ad_result = ads.create_paid_ig_mixed_carousel_ad_json(
                 adset_index=INDEX,
@@ -564,11 +785,12 @@ def main() -> None:
                 status=AD_STATUS,
                 link_url=final_link,
             )
-            log_response("STEP 6 create_paid_ig_mixed_carousel_ad_json()", ad_result)
+            log_response(log, "STEP 6 create_paid_ig_mixed_carousel_ad_json()", ad_result)
         except Exception as e:
-            log_error("STEP 6", e)
+            log_error(log, "STEP 6", e)
             return
 
 
 if __name__ == "__main__":
+    configure_logging()
     main()
@@ -4,20 +4,20 @@ from __future__ import annotations
 from dotenv import load_dotenv
 load_dotenv()
 
+import asyncio
 import os
 from pathlib import Path
 
-from fastapi import UploadFile
-
+from app.config import get_config
 from app.models.spaces_uploader import SpacesUploader
 from app.models.ig_organic_poster import (
-    organic_posts,
-    upload_video_instagram,
-    publish_video_instagram,
-    upload_photo_instagram,
-    publish_photo_instagram,
-    upload_carousel_instagram,
-    publish_carousel_instagram,
+    aclose_graph_client,
+    upload_video_post,
+    publish_video_post,
+    upload_photo_post,
+    publish_photo_post,
+    upload_carousel_post,
+    publish_carousel_post,
 )
 from app.routers.DB_helpers.meta_token_db_reader import MetaTokenDbReader
 from app.models.schemas import OrganicPost, CarouselItem
@@ -28,9 +28,11 @@ DEFAULT_VIDEO_PATH = r"C:\Users\User\Desktop\Ig_Reels\istockphoto-2097298327-640
 DEFAULT_IMAGE_PATH = r"C:\Users\User\Pictures\example.jpg"
 DEFAULT_TITLE = "AI is changing everything 🤖"
 
-CLIENT_ID = os.environ["CLIENT_ID"]
-DATABASE_URL = os.environ["DATABASE_URL"]
-FERNET_KEY = os.environ["TOKEN_ENCRYPTION_KEY"]
+CFG = get_config()
+
+CLIENT_ID = CFG.client_id
+DATABASE_URL = CFG.database_url
+FERNET_KEY = CFG.fernet_key
 
 uploader = SpacesUploader()
 
@@ -66,12 +68,26 @@ def prompt_asset_type() -> str:
         print("Invalid choice. Please select 1, 2, or 3.")
 
 
+_VIDEO_SUFFIXES = frozenset({".mp4", ".mov", ".m4v"})
+_IMAGE_SUFFIXES = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+
+
 def _ext_is_video(ext: str) -> bool:
-    return ext in {".mp4", ".mov", ".m4v"}
+    return ext in _VIDEO_SUFFIXES
 
 
 def _ext_is_image(ext: str) -> bool:
-    return ext in {".jpg", ".jpeg", ".png", ".webp"}
+    return ext in _IMAGE_SUFFIXES
+
+
+async def _create_and_publish(create, publish, page_id: str, post: OrganicPost) -> None:
+    # one event loop for both steps so they share the poster's pooled Graph client
+    # the post is filled in place (creation_id, instagram_post_id); nothing goes into the shared store
+    try:
+        await create(CLIENT_ID, page_id, post, DATABASE_URL, FERNET_KEY)
+        await publish(CLIENT_ID, page_id, post, DATABASE_URL, FERNET_KEY)
+    finally:
+        await aclose_graph_client()
 
 
 # ---------------- MAIN ----------------
@@ -96,23 +112,12 @@ def main() -> None:
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video not found: {video_path}")
 
-        with open(video_path, "rb") as f:
-            upload_file = UploadFile(filename=os.path.basename(video_path), file=f)
-
-            video_url = uploader.upload_organic_video(
-                fileobj=upload_file.file,
-                filename=upload_file.filename,
-                content_type=upload_file.content_type or "video/mp4",
-            )
+        video_url = uploader.upload_organic_from_path(video_path, kind="video")
 
         organic_post = OrganicPost(title=title, video_url=video_url)
         print(f"[spaces] Video URL: {organic_post.video_url}")
 
-        organic_posts.append(organic_post)
-        idx = len(organic_posts) - 1
-
-        upload_video_instagram(CLIENT_ID, str(page_id), idx, DATABASE_URL, FERNET_KEY)
-        publish_video_instagram(CLIENT_ID, str(page_id), idx, DATABASE_URL, FERNET_KEY)
+        asyncio.run(_create_and_publish(upload_video_post, publish_video_post, str(page_id), organic_post))
 
     # ================= IMAGE =================
     elif asset_type == "image":
@@ -120,23 +125,12 @@ def main() -> None:
         if not os.path.exists(image_path):
             raise FileNotFoundError(f"Image not found: {image_path}")
 
-        with open(image_path, "rb") as f:
-            upload_file = UploadFile(filename=os.path.basename(image_path), file=f)
-
-            image_url = uploader.upload_organic_image(
-                fileobj=upload_file.file,
-                filename=upload_file.filename,
-                content_type=upload_file.content_type or "image/jpeg",
-            )
+        image_url = uploader.upload_organic_from_path(image_path, kind="image")
 
         organic_post = OrganicPost(title=title, image_url=image_url)
         print(f"[spaces] Image URL: {organic_post.image_url}")
 
-        organic_posts.append(organic_post)
-        idx = len(organic_posts) - 1
-
-        upload_photo_instagram(CLIENT_ID, str(page_id), idx, DATABASE_URL, FERNET_KEY)
-        publish_photo_instagram(CLIENT_ID, str(page_id), idx, DATABASE_URL, FERNET_KEY)
+        asyncio.run(_create_and_publish(upload_photo_post, publish_photo_post, str(page_id), organic_post))
 
     # ================= CAROUSEL =================
     else:
@@ -159,36 +153,21 @@ def main() -> None:
                 print("Unsupported file type.")
                 continue
 
-            with open(path, "rb") as f:
-                upload_file = UploadFile(filename=os.path.basename(path), file=f)
-
-                if _ext_is_video(ext):
-                    url = uploader.upload_organic_video(
-                        fileobj=upload_file.file,
-                        filename=upload_file.filename,
-                        content_type=upload_file.content_type or "video/mp4",
-                    )
-                    items.append(CarouselItem(type="video", url=url))
-                    print(f"[spaces] Carousel video: {url}")
-                else:
-                    url = uploader.upload_organic_image(
-                        fileobj=upload_file.file,
-                        filename=upload_file.filename,
-                        content_type=upload_file.content_type or "image/jpeg",
-                    )
-                    items.append(CarouselItem(type="image", url=url))
-                    print(f"[spaces] Carousel image: {url}")
+            if _ext_is_video(ext):
+                url = uploader.upload_organic_from_path(path, kind="video")
+                items.append(CarouselItem(type="video", url=url))
+                print(f"[spaces] Carousel video: {url}")
+            else:
+                url = uploader.upload_organic_from_path(path, kind="image")
+                items.append(CarouselItem(type="image", url=url))
+                print(f"[spaces] Carousel image: {url}")
 
         if len(items) < 2:
             raise RuntimeError("Carousel requires at least 2 items.")
 
         organic_post = OrganicPost(title=title, carousel_items=items)
 
-        organic_posts.append(organic_post)
-        idx = len(organic_posts) - 1
-
-        upload_carousel_instagram(CLIENT_ID, str(page_id), idx, DATABASE_URL, FERNET_KEY)
-        publish_carousel_instagram(CLIENT_ID, str(page_id), idx, DATABASE_URL, FERNET_KEY)
+        asyncio.run(_create_and_publish(upload_carousel_post, publish_carousel_post, str(page_id), organic_post))
 
     # ---------- Final output ----------
     print("\n✅ Organic post published successfully")
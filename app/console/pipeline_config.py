@@ -0,0 +1,122 @@
+# app/console/pipeline_config.py
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Literal, Mapping, Optional, Sequence, get_args
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+Mode = Literal["video", "image", "carousel_images", "carousel_mixed"]
+MODES: tuple[str, ...] = get_args(Mode)
+
+
+class PipelineConfig(BaseModel):
+    """
+    One ad-pipeline run (IG or FB). Strict: a JSON "1000" budget or a single string
+    for carousel_paths is rejected instead of being coerced.
+    body is the FB primary text; the IG pipeline ignores it.
+    """
+
+    model_config = ConfigDict(frozen=True, extra="forbid", strict=True)
+
+    mode: Mode
+    daily_budget: int = Field(1000, gt=0)
+    title: str = "Check this out!"
+    body: str = "Discover more."
+    link: str = "youtube.com"
+    video_path: str = ""
+    image_path: str = ""
+    carousel_paths: list[str] = Field(default_factory=list)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str | os.PathLike,
+        *,
+        defaults: Optional[Mapping[str, Any]] = None,
+    ) -> "PipelineConfig":
+        """One run from a JSON object keyed by field name (e.g. a queued ad variant)."""
+        with open(path, "rb") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"{path}: expected a JSON object")
+        return cls.model_validate({**(defaults or {}), **data})
+
+    @classmethod
+    def from_args(
+        cls,
+        argv: Optional[Sequence[str]] = None,
+        *,
+        description: str,
+        defaults: Optional[Mapping[str, Any]] = None,
+    ) -> Optional["PipelineConfig"]:
+        """
+        Non-interactive run, e.g.:
+          python -m app.console.main_ig_ad_pipeline --mode carousel_images --carousel a.jpg b.jpg
+          python -m app.console.main_fb_ad_pipeline --config ad.json [--title ...]
+        defaults: per-pipeline field defaults (link, video_path, ...).
+        Flags given next to --config override the file.
+        Returns None without --mode/--config (or with --interactive): the pipeline then falls
+        back to its prompts, which needs a terminal on stdin.
+        """
+        base = {
+            name: f.get_default(call_default_factory=True)
+            for name, f in cls.model_fields.items()
+            if name != "mode"
+        }
+        base.update(defaults or {})
+
+        parser = argparse.ArgumentParser(description=description)
+        parser.add_argument("--config", metavar="JSON", help="PipelineConfig fields as a JSON object")
+        parser.add_argument("--mode", choices=MODES)
+        parser.add_argument("--daily-budget", type=int, default=base["daily_budget"])
+        parser.add_argument("--title", default=base["title"])
+        parser.add_argument("--body", default=base["body"], help="primary text (FB caption)")
+        parser.add_argument("--link", default=base["link"])
+        parser.add_argument("--video", default=base["video_path"])
+        parser.add_argument("--image", default=base["image_path"])
+        parser.add_argument("--carousel", nargs="+", default=list(base["carousel_paths"]), metavar="PATH")
+        parser.add_argument("--interactive", action="store_true", help="ask for every value on stdin")
+        args = parser.parse_args(argv)
+
+        if args.config:
+            try:
+                loaded = cls.from_file(args.config, defaults=base)
+            except (OSError, ValueError) as e:  # ValidationError is a ValueError
+                parser.error(f"--config: {e}")
+            # second pass: the file supplies the defaults, explicit flags still win
+            parser.set_defaults(
+                mode=loaded.mode,
+                daily_budget=loaded.daily_budget,
+                title=loaded.title,
+                body=loaded.body,
+                link=loaded.link,
+                video=loaded.video_path,
+                image=loaded.image_path,
+                carousel=list(loaded.carousel_paths),
+            )
+            args = parser.parse_args(argv)
+
+        if args.interactive or not args.mode:
+            if not sys.stdin.isatty():
+                parser.error("stdin is not a terminal: pass --mode or --config")
+            return None
+        if args.mode.startswith("carousel") and len(args.carousel) < 2:
+            parser.error("Carousel requires at least 2 items (--carousel PATH PATH ...).")
+
+        try:
+            return cls(
+                mode=args.mode,
+                daily_budget=args.daily_budget,
+                title=args.title,
+                body=args.body,
+                link=args.link,
+                video_path=args.video,
+                image_path=args.image,
+                carousel_paths=list(args.carousel),
+            )
+        except ValidationError as e:
+            parser.error(str(e))
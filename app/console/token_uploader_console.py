@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from dotenv import load_dotenv
 import os
+import threading
 import webbrowser
 from urllib.parse import urlparse, parse_qs
 
@@ -91,6 +92,9 @@ def main() -> None:
     except Exception:
         pass
 
+    # warm the Graph connection while the user is logging in
+    threading.Thread(target=oauth.warm_up, daemon=True).start()
+
     callback_raw = input("\nPaste redirect URL or code: ").strip()
     parsed = parse_callback_input(callback_raw)
 
@@ -7,6 +7,14 @@ from typing import Any, Dict, List, Optional
 
 import requests
 
+# Optional dependency (graceful)
+try:
+    import orjson  # type: ignore
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+from app.models.graph_http import SESSION  # one Graph keep-alive pool (429/5xx retry on idempotent calls)
 from app.routers.DB_helpers.meta_token_db_reader import MetaTokenDbReader
 
 
@@ -63,6 +71,7 @@ class FbAdsStairway:
         page_id: str,
         graph_version: str = "v17.0",
         timeout_s: int = 60,
+        http_session: Optional[requests.Session] = None,
     ) -> None:
         self.database_url = database_url
         self.encryption_key = encryption_key
@@ -71,6 +80,7 @@ class FbAdsStairway:
         self.page_id = str(page_id)
         self.graph_version = str(graph_version)
         self.timeout_s = int(timeout_s)
+        self._http = http_session or SESSION
 
         self._reader = MetaTokenDbReader(database_url=self.database_url, fernet_key=self.encryption_key)
 
@@ -118,7 +128,7 @@ class FbAdsStairway:
         else:
             p["access_token"] = self._user_access_token()
 
-        resp = requests.request(
+        resp = self._http.request(
             method=method.upper(),
             url=url,
             params=p,
@@ -128,7 +138,7 @@ class FbAdsStairway:
         )
 
         try:
-            payload = resp.json()
+            payload = orjson.loads(resp.content) if HAS_ORJSON else resp.json()
         except Exception:
             resp.raise_for_status()
             return {"raw": resp.text}
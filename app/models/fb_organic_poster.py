@@ -1,23 +1,35 @@
 # app/routers/fb_organic_poster.py
 from __future__ import annotations
 
+import json
 import os
+import re
 import time
 import requests
+from functools import lru_cache
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse
 
+from app.config import env_float, env_int
 from app.models.schemas import OrganicPost, CarouselItem
 from app.routers.DB_helpers.meta_token_db_reader import MetaTokenDbReader
 
-router = APIRouter()
+# Optional dependency (graceful)
+try:
+    import orjson  # type: ignore  # noqa: F401  (used by ORJSONResponse)
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+router = APIRouter(default_response_class=ORJSONResponse if HAS_ORJSON else JSONResponse)
 GRAPH_API_VERSION = os.getenv("GRAPH_API_VERSION", "v17.0")
 
-MAX_RETRIES = 20
-RETRY_DELAY = 5
+MAX_RETRIES = env_int("FB_STATUS_MAX_RETRIES", 20)
+RETRY_DELAY = env_float("FB_STATUS_RETRY_DELAY_S", 5.0)
 
-# In-memory list (kept for backward compatibility with your pipeline)
+# In-memory list behind the index-keyed routes (the console pipeline passes posts directly)
 organic_posts: list[OrganicPost] = []
 
 
@@ -27,7 +39,11 @@ organic_posts: list[OrganicPost] = []
 PUBLIC_BASE_URL = (os.getenv("PUBLIC_BASE_URL") or os.getenv("DROPLET_PUBLIC_BASE_URL") or "").strip().rstrip("/")
 NGROK_BASE_URL = (os.getenv("NGROK_BASE_URL") or "").strip().rstrip("/")
 
+_ABSOLUTE_URL_RE = re.compile(r"^https?://", re.IGNORECASE)
+
 
+# Pure function of the URL (+ module-level bases): memoize, carousels hit the same URLs repeatedly
+@lru_cache(maxsize=512)
 def _normalize_public_media_url(url: Optional[str]) -> Optional[str]:
     if not url:
         return url
@@ -37,7 +53,7 @@ def _normalize_public_media_url(url: Optional[str]) -> Optional[str]:
         return u
 
     # Already a public URL (Spaces/CDN/etc.)
-    if u.startswith("http://") or u.startswith("https://"):
+    if _ABSOLUTE_URL_RE.match(u):
         if NGROK_BASE_URL and PUBLIC_BASE_URL and u.startswith(NGROK_BASE_URL):
             return PUBLIC_BASE_URL + u[len(NGROK_BASE_URL) :]
         return u
@@ -81,25 +97,37 @@ def _load_page_access_token(
 
 
 def _wait_until_media_finished(creation_id: str, page_access_token: str) -> None:
-    status_url = (
-        f"https://graph.facebook.com/{GRAPH_API_VERSION}/{creation_id}"
-        f"?fields=status_code&access_token={page_access_token}"
-    )
+    # token goes in the Authorization header, so it never appears in a URL that proxies/servers log
+    status_req = requests.Request(
+        "GET",
+        f"https://graph.facebook.com/{GRAPH_API_VERSION}/{creation_id}",
+        params={"fields": "status_code"},
+        headers={"Authorization": f"OAuth {page_access_token}"},
+    ).prepare()
+
+    with requests.Session() as http:
+        for _ in range(MAX_RETRIES):
+            status_resp = http.send(status_req, timeout=60).json()
+            if "error" in status_resp:
+                raise HTTPException(status_code=400, detail=status_resp["error"])
+
+            status = status_resp.get("status_code")
+            if status == "FINISHED":
+                return
+            if status == "ERROR":
+                raise HTTPException(status_code=400, detail="Media failed to process")
+
+            time.sleep(RETRY_DELAY)
 
-    for _ in range(MAX_RETRIES):
-        status_resp = requests.get(status_url, timeout=60).json()
-        if "error" in status_resp:
-            raise HTTPException(status_code=400, detail=status_resp["error"])
-
-        status = status_resp.get("status_code")
-        if status == "FINISHED":
-            return
-        if status == "ERROR":
-            raise HTTPException(status_code=400, detail="Media failed to process")
+    raise HTTPException(status_code=400, detail="Media not ready after multiple attempts")
 
-        time.sleep(RETRY_DELAY)
 
-    raise HTTPException(status_code=400, detail="Media not ready after multiple attempts")
+# The *_post() functions work on the OrganicPost itself (console pipeline, no list);
+# the index-keyed functions below them are the router entry points.
+def _get_post(organic_post_index: int) -> OrganicPost:
+    if not 0 <= organic_post_index < len(organic_posts):
+        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
+    return organic_posts[organic_post_index]
 
 
 def _item_type_url(item) -> tuple[str, Optional[str]]:
@@ -113,18 +141,13 @@ def _item_type_url(item) -> tuple[str, Optional[str]]:
 # ---------------------------------------------------------------------
 # FB: VIDEO (uploaded by URL -> published)
 # ---------------------------------------------------------------------
-@router.post("/fb/organic/upload-video/{organic_post_index}")
-def upload_video_facebook(
+def upload_video_post(
     client_id: str,
     page_id: str,
-    organic_post_index: int,
+    post: OrganicPost,
     database_url: str,
     fernet_key: str,
 ):
-    if organic_post_index >= len(organic_posts):
-        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
-
-    post = organic_posts[organic_post_index]
     if not post.video_url:
         raise HTTPException(status_code=400, detail="video_url not set")
 
@@ -154,18 +177,24 @@ def upload_video_facebook(
     return {"message": "Facebook video uploaded (unpublished)", "creation_id": post.creation_id}
 
 
-@router.post("/fb/organic/publish-video/{organic_post_index}")
-def publish_video_facebook(
+@router.post("/fb/organic/upload-video/{organic_post_index}")
+def upload_video_facebook(
     client_id: str,
     page_id: str,
     organic_post_index: int,
     database_url: str,
     fernet_key: str,
 ):
-    if organic_post_index >= len(organic_posts):
-        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
+    return upload_video_post(client_id, page_id, _get_post(organic_post_index), database_url, fernet_key)
+
 
-    post = organic_posts[organic_post_index]
+def publish_video_post(
+    client_id: str,
+    page_id: str,
+    post: OrganicPost,
+    database_url: str,
+    fernet_key: str,
+):
     if not post.creation_id:
         raise HTTPException(status_code=400, detail="Creation ID not set")
 
@@ -190,13 +219,24 @@ def publish_video_facebook(
     return {"message": "Facebook video published", "facebook_post_id": post.facebook_post_id}
 
 
+@router.post("/fb/organic/publish-video/{organic_post_index}")
+def publish_video_facebook(
+    client_id: str,
+    page_id: str,
+    organic_post_index: int,
+    database_url: str,
+    fernet_key: str,
+):
+    return publish_video_post(client_id, page_id, _get_post(organic_post_index), database_url, fernet_key)
+
+
 # ---------------------------------------------------------------------
 # FB: IMAGE (photo)
 # ---------------------------------------------------------------------
-def upload_photo_facebook(
+def upload_photo_post(
     client_id: str,
     page_id: str,
-    organic_post_index: int,
+    post: OrganicPost,
     database_url: str,
     fernet_key: str,
 ):
@@ -204,10 +244,6 @@ def upload_photo_facebook(
     Facebook Page photo: publish at creation time.
     Graph: POST /{page_id}/photos with published=true
     """
-    if organic_post_index >= len(organic_posts):
-        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
-
-    post = organic_posts[organic_post_index]
     if not post.image_url:
         raise HTTPException(status_code=400, detail="image_url not set")
 
@@ -240,6 +276,16 @@ def upload_photo_facebook(
     }
 
 
+def upload_photo_facebook(
+    client_id: str,
+    page_id: str,
+    organic_post_index: int,
+    database_url: str,
+    fernet_key: str,
+):
+    return upload_photo_post(client_id, page_id, _get_post(organic_post_index), database_url, fernet_key)
+
+
 def publish_photo_facebook(*args, **kwargs):
     """
     No-op: photo is already published on upload.
@@ -253,19 +299,10 @@ def publish_photo_facebook(*args, **kwargs):
 # This requires a link. We'll use the first item as the link by default unless you pass link_url.
 # ---------------------------------------------------------------------
 
-
-
-import json
-import requests
-from fastapi import HTTPException
-from typing import Optional
-
-# assumes you already have: organic_posts, _load_page_access_token, _normalize_public_media_url, _item_type_url, GRAPH_API_VERSION
-
-def upload_carousel_facebook(
+def upload_carousel_post(
     client_id: str,
     page_id: str,
-    organic_post_index: int,
+    post: OrganicPost,
     database_url: str,
     fernet_key: str,
     link_url: Optional[str] = None,
@@ -273,10 +310,6 @@ def upload_carousel_facebook(
     """
     Store the payload only. Publishing happens in publish_carousel_facebook().
     """
-    if organic_post_index >= len(organic_posts):
-        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
-
-    post = organic_posts[organic_post_index]
     if not post.carousel_items:
         raise HTTPException(status_code=400, detail="carousel_items not set")
 
@@ -316,17 +349,24 @@ def upload_carousel_facebook(
     return {"message": "FB carousel payload stored", "ready": True}
 
 
-def publish_carousel_facebook(
+def upload_carousel_facebook(
     client_id: str,
     page_id: str,
     organic_post_index: int,
     database_url: str,
     fernet_key: str,
+    link_url: Optional[str] = None,
 ):
-    if organic_post_index >= len(organic_posts):
-        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
+    return upload_carousel_post(client_id, page_id, _get_post(organic_post_index), database_url, fernet_key, link_url=link_url)
+
 
-    post = organic_posts[organic_post_index]
+def publish_carousel_post(
+    client_id: str,
+    page_id: str,
+    post: OrganicPost,
+    database_url: str,
+    fernet_key: str,
+):
     payload = getattr(post, "_fb_feed_payload", None)
     if not payload:
         raise HTTPException(status_code=400, detail="No stored payload. Call upload first.")
@@ -349,12 +389,24 @@ def publish_carousel_facebook(
 
     # If your OrganicPost schema does not have facebook_post_id, do NOT assign it.
     return {"message": "FB carousel published", "facebook_post_id": resp.get("id")}
-def publish_mixed_media_bundle_facebook(
+
+
+def publish_carousel_facebook(
     client_id: str,
     page_id: str,
     organic_post_index: int,
     database_url: str,
     fernet_key: str,
+):
+    return publish_carousel_post(client_id, page_id, _get_post(organic_post_index), database_url, fernet_key)
+
+
+def publish_mixed_media_bundle_post(
+    client_id: str,
+    page_id: str,
+    post: OrganicPost,
+    database_url: str,
+    fernet_key: str,
 ):
     """
     Mixed media bundle publishing for Facebook Pages:
@@ -363,10 +415,6 @@ def publish_mixed_media_bundle_facebook(
 
     This is NOT a single mixed carousel post (FB doesn't support that like IG).
     """
-    if organic_post_index >= len(organic_posts):
-        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
-
-    post = organic_posts[organic_post_index]
     if not post.carousel_items:
         raise HTTPException(status_code=400, detail="carousel_items not set")
 
@@ -466,4 +514,14 @@ def publish_mixed_media_bundle_facebook(
 
         results["photo_post"] = {"facebook_post_id": feed.get("id"), "photo_ids": photo_ids}
 
-    return {"message": "Mixed media bundle published", "result": results}
\ No newline at end of file
+    return {"message": "Mixed media bundle published", "result": results}
+
+
+def publish_mixed_media_bundle_facebook(
+    client_id: str,
+    page_id: str,
+    organic_post_index: int,
+    database_url: str,
+    fernet_key: str,
+):
+    return publish_mixed_media_bundle_post(client_id, page_id, _get_post(organic_post_index), database_url, fernet_key)
@@ -0,0 +1,35 @@
+# app/models/graph_http.py
+from __future__ import annotations
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.config import env_float
+
+
+def graph_session(*, pool_connections: int = 10, pool_maxsize: int = 50) -> requests.Session:
+    """
+    Keep-alive pool to graph.facebook.com (the module SESSION, or a caller-owned per-run pool).
+    Retries 429/5xx with backoff on idempotent methods only (urllib3 default),
+    so a POST that creates a campaign/adset/ad is never replayed.
+    """
+    s = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    )
+    s.mount("https://", HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry))
+    return s
+
+
+# Shared by the IG and FB ad stairways
+SESSION = graph_session()
+
+# (connect, read) applied to every Graph call that doesn't pass its own timeout
+DEFAULT_TIMEOUT = (
+    env_float("GRAPH_CONNECT_TIMEOUT_S", 3.05),
+    env_float("GRAPH_READ_TIMEOUT_S", 30.0),
+)
@@ -1,17 +1,77 @@
 # app/models/ads_stairway.py
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import itertools
+import logging
 import os
 import json
 import mimetypes
+import random
+import threading
+import time
 import requests
-from typing import List, Literal, Optional, TypedDict
-
+from contextlib import ExitStack
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Dict, Literal, Optional, Tuple, TypedDict, TypeVar
+from urllib.parse import urlencode
+
+# Optional dependencies (graceful)
+try:
+    from requests_toolbelt import MultipartEncoder  # type: ignore
+    HAS_TOOLBELT = True
+except Exception:
+    HAS_TOOLBELT = False
+
+try:
+    import orjson  # type: ignore
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+from app.config import env_float, env_int
 from app.models import schemas
+from app.models.graph_http import DEFAULT_TIMEOUT, SESSION
 from app.routers.DB_helpers.meta_token_db_reader import MetaTokenDbReader
 
 MetaStatus = Literal["ACTIVE", "PAUSED"]
 AssetType = Literal["video", "image"]
+_T = TypeVar("_T")
+
+logger = logging.getLogger(__name__)
+
+
+def _get(url: str, *, session: Optional[requests.Session] = None, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return (session or SESSION).get(url, **kwargs)
+
+
+def _post(url: str, *, session: Optional[requests.Session] = None, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return (session or SESSION).post(url, **kwargs)
+
+# Concurrent creative+ad creations in create_paid_ig_ads_bulk (Meta throttles per ad account)
+BULK_AD_CONCURRENCY = 4
+
+# Graph API limit on operations per batch request
+GRAPH_BATCH_MAX = 50
+
+# Graph throttling error codes (app / user / ad-account rate limits). Image uploads are
+# content-addressed (same bytes -> same hash), so throttled batch operations are safe to resend.
+_THROTTLE_CODES = frozenset({4, 17, 613, 80004})
+# 0 is valid (no resend); malformed / negative values fall back to the default, never below 0
+BATCH_THROTTLE_RETRIES = env_int("GRAPH_BATCH_THROTTLE_RETRIES", 4, minimum=0)
+BATCH_THROTTLE_DELAY_S = env_float("GRAPH_BATCH_THROTTLE_DELAY_S", 2.0, allow_zero=True)
+
+
+def _is_throttled(error: object) -> bool:
+    return isinstance(error, dict) and error.get("code") in _THROTTLE_CODES
+
+# /me/adaccounts per user token (token fingerprint -> (expires_at, accounts)); the list rarely changes
+_AD_ACCOUNTS_TTL_S = 300.0
+_AD_ACCOUNTS_CACHE: dict[str, tuple[float, list[dict]]] = {}
+_AD_ACCOUNTS_LOCK = threading.Lock()
 
 
 def normalize_status(status: MetaStatus) -> str:
@@ -21,6 +81,54 @@ def normalize_status(status: MetaStatus) -> str:
     return s
 
 
+# Content types for the extensions the pipelines upload; mimetypes only for anything else
+_MIME: Dict[str, str] = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".mp4": "video/mp4",
+    ".mov": "video/quicktime",
+    ".m4v": "video/x-m4v",
+}
+
+
+def _guess_mime(filename: str, default: str = "application/octet-stream") -> str:
+    ext = os.path.splitext(filename)[1].lower()
+    return _MIME.get(ext) or mimetypes.guess_type(filename)[0] or default
+
+
+def _file_digest(path: str) -> str:
+    """blake2b-128 of a file, read in 1 MiB chunks."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _json(resp: requests.Response):
+    # orjson decodes Graph responses several times faster than resp.json() (stdlib json)
+    if HAS_ORJSON:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+
+def _redact_tokens(payload):
+    """Copy of payload with any access_token value (top level or one dict deep) masked."""
+    if not isinstance(payload, dict):
+        return payload
+    out = {}
+    for k, v in payload.items():
+        if k == "access_token":
+            out[k] = "REDACTED"
+        elif isinstance(v, dict) and "access_token" in v:
+            out[k] = {**v, "access_token": "REDACTED"}
+        else:
+            out[k] = v
+    return out
+
+
 class VideoCarouselCard(TypedDict):
     video_id: str
     image_hash: str  # thumbnail hash
@@ -50,14 +158,20 @@ class AdsStairway:
         page_id: str,
         instagram_actor_id: str,
         graph_version: str = "v17.0",
+        http_session: Optional[requests.Session] = None,
+        reader: Optional[MetaTokenDbReader] = None,
     ) -> None:
         self.graph_version = graph_version
+        # caller-owned pool (e.g. one per pipeline run); defaults to the shared graph_http.SESSION
+        self._http = http_session
+        self._graph_base = f"https://graph.facebook.com/{graph_version}"
         self.client_id = client_id
         self.page_id = page_id
         self.instagram_actor_id = instagram_actor_id
         self.meta_user_id = meta_user_id
 
-        self.reader = MetaTokenDbReader(database_url, encryption_key)
+        # a caller's (pooled) reader avoids a fresh DB connection per token lookup
+        self.reader = reader or MetaTokenDbReader(database_url, encryption_key)
 
         self.user_access_token = self._resolve_token(
             self.reader.get_active_user_token(client_id, meta_user_id)
@@ -66,13 +180,22 @@ class AdsStairway:
             self.reader.get_active_page_token(client_id, page_id)
         )
 
-        self.campaigns: List[schemas.Campaign] = []
-        self.created_campaigns: List[schemas.CreatedCampaign] = []
-        self.adsets: List[schemas.AdSet] = []
+        # index -> object; indices come from one counter per kind (stable, never reused)
+        self.campaigns: Dict[int, schemas.Campaign] = {}
+        self.created_campaigns: Dict[int, schemas.CreatedCampaign] = {}
+        self.adsets: Dict[int, schemas.AdSet] = {}
+        self._next_campaign = itertools.count()
+        self._next_created_campaign = itertools.count()
+        self._next_adset = itertools.count()
+        self._lock = threading.Lock()
 
         # Keep hashes outside AdSet (Pydantic-safe)
         self._image_hash_by_adset_id: dict[str, str] = {}
         self._carousel_hashes_by_adset_id: dict[str, list[str]] = {}
+        # (ad_account_id, file blake2b) -> image_hash: the same bytes are uploaded once per account
+        self._image_hash_by_digest: dict[tuple[str, str], str] = {}
+        # same key -> the upload in flight, so concurrent callers wait for it instead of racing it
+        self._image_hash_inflight: dict[tuple[str, str], Future] = {}
 
     # ---------------- INTERNAL ----------------
     @staticmethod
@@ -83,65 +206,104 @@ class AdsStairway:
             return str(row["access_token"])
         return str(row.access_token)
 
+    def _store(self, items: Dict[int, _T], counter: "itertools.count[int]", item: _T) -> int:
+        with self._lock:
+            idx = next(counter)
+            items[idx] = item
+        return idx
+
+    def _lookup(self, items: Dict[int, _T], idx: int, what: str) -> _T:
+        with self._lock:
+            item = items.get(idx)
+        if item is None:
+            raise Exception(f"Invalid {what} index")
+        return item
+
+    def _adset(self, adset_index: int) -> schemas.AdSet:
+        return self._lookup(self.adsets, adset_index, "adset")
+
     @staticmethod
     def _dbg(tag: str, payload) -> None:
+        # payloads are only serialized when DEBUG is on; tokens never reach the log
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        payload = _redact_tokens(payload)
         try:
-            print(f"\n[DBG] {tag}:")
-            print(json.dumps(payload, indent=2, ensure_ascii=False, default=str))
+            logger.debug("%s:\n%s", tag, json.dumps(payload, indent=2, ensure_ascii=False, default=str))
         except Exception:
-            print(f"\n[DBG] {tag}: {payload!r}")
+            logger.debug("%s: %r", tag, payload)
 
-    @staticmethod
-    def _post_form(url: str, payload: dict) -> dict:
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        return _get(url, session=self._http, **kwargs)
+
+    def _post(self, url: str, **kwargs) -> requests.Response:
+        return _post(url, session=self._http, **kwargs)
+
+    def _post_form(self, url: str, payload: dict, files: Optional[dict] = None) -> dict:
         """
         Marketing API is often most reliable with form-encoded payloads.
         Any nested objects must be JSON-serialized manually.
+        With files, the same fields go out as multipart/form-data.
         """
-        resp = requests.post(url, data=payload)
+        resp = self._post(url, data=payload, files=files)
         try:
-            return resp.json()
+            return _json(resp)
         except Exception:
             return {"_raw": resp.text}
 
     # ---------------- ACCOUNTS ----------------
-    def get_ad_accounts(self, campaign_name: str, objective: str):
-        url = f"https://graph.facebook.com/{self.graph_version}/me/adaccounts"
+    def _fetch_ad_accounts(self) -> list[dict]:
+        """[{"id": "act_...", "name": ...}], cached per user token for _AD_ACCOUNTS_TTL_S."""
+        key = hashlib.blake2b(self.user_access_token.encode("utf-8"), digest_size=16).hexdigest()
+        now = time.monotonic()
+        with _AD_ACCOUNTS_LOCK:
+            hit = _AD_ACCOUNTS_CACHE.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+
+        url = f"{self._graph_base}/me/adaccounts"
         params = {"access_token": self.user_access_token, "fields": "id,name"}
 
-        result = requests.get(url, params=params).json()
+        result = _json(self._get(url, params=params))
         if "error" in result:
             raise Exception(result["error"])
 
         accounts = []
         for row in result.get("data", []):
             ad_account_id = row["id"] if row["id"].startswith("act_") else f"act_{row['id']}"
-            self.campaigns.append(
+            accounts.append({"id": ad_account_id, "name": row.get("name")})
+
+        with _AD_ACCOUNTS_LOCK:
+            _AD_ACCOUNTS_CACHE[key] = (now + _AD_ACCOUNTS_TTL_S, accounts)
+        return accounts
+
+    def get_ad_accounts(self, campaign_name: str, objective: str):
+        accounts = self._fetch_ad_accounts()
+
+        # record one Campaign per account; repeated calls don't grow the list
+        with self._lock:
+            known = {(c.ad_account_id, c.name, c.objective) for c in self.campaigns.values()}
+        for acc in accounts:
+            if (acc["id"], campaign_name, objective) in known:
+                continue
+            self._store(
+                self.campaigns,
+                self._next_campaign,
                 schemas.Campaign(
-                    ad_account_id=ad_account_id,
+                    ad_account_id=acc["id"],
                     name=campaign_name,
                     objective=objective,
-                )
+                ),
             )
-            accounts.append({"id": ad_account_id, "name": row.get("name")})
 
-        return {"ad_accounts": accounts}
+        return {"ad_accounts": [dict(acc) for acc in accounts]}
 
     # ---------------- CAMPAIGN ----------------
     def create_campaign_by_index(self, index: int, status: MetaStatus = "PAUSED"):
-        if index >= len(self.campaigns):
-            raise Exception("Invalid campaign index")
+        campaign = self._lookup(self.campaigns, index, "campaign")
+        url = f"{self._graph_base}/{campaign.ad_account_id}/campaigns"
 
-        campaign = self.campaigns[index]
-        url = f"https://graph.facebook.com/{self.graph_version}/{campaign.ad_account_id}/campaigns"
-
-        payload = {
-            "name": campaign.name,
-            "objective": campaign.objective.strip(),
-            "status": normalize_status(status),
-            "special_ad_categories": json.dumps(["NONE"]),
-            "is_adset_budget_sharing_enabled": "false",
-            "access_token": self.user_access_token,
-        }
+        payload = {**self._campaign_payload(campaign, status), "access_token": self.user_access_token}
 
         self._dbg("campaign.create.request", {"url": url, "payload": payload})
         result = self._post_form(url, payload)
@@ -157,9 +319,19 @@ class AdsStairway:
             objective=campaign.objective,
             page_id=self.page_id,
         )
-        self.created_campaigns.append(created)
+        self._store(self.created_campaigns, self._next_created_campaign, created)
         return created
 
+    @staticmethod
+    def _campaign_payload(campaign: schemas.Campaign, status: MetaStatus) -> dict:
+        return {
+            "name": campaign.name,
+            "objective": campaign.objective.strip(),
+            "status": normalize_status(status),
+            "special_ad_categories": json.dumps(["NONE"]),
+            "is_adset_budget_sharing_enabled": "false",
+        }
+
     # ---------------- ADSET ----------------
     def create_adset(
     self,
@@ -180,19 +352,42 @@ class AdsStairway:
         - if provided, overrides campaign.optimization_goal (and defaults)
         - typical values: "REACH", "IMPRESSIONS", "LINK_CLICKS", "LANDING_PAGE_VIEWS", etc.
         """
-        if index >= len(self.created_campaigns):
-            raise Exception("Invalid campaign index")
-
-        campaign = self.created_campaigns[index]
-        url = f"https://graph.facebook.com/{self.graph_version}/{campaign.ad_account_id}/adsets"
+        campaign = self._lookup(self.created_campaigns, index, "campaign")
+        url = f"{self._graph_base}/{campaign.ad_account_id}/adsets"
 
-        ig_positions = ["stream", "story", "reels"] if asset_type == "video" else ["stream", "story"]
         final_budget = int(daily_budget) if daily_budget is not None else int(campaign.daily_budget)
 
         # NEW: resolve optimization_goal
         og = (optimization_goal or getattr(campaign, "optimization_goal", None) or "REACH").strip().upper()
 
-        promoted_object = {"page_id": str(campaign.page_id)}
+        payload = {
+            "campaign_id": str(campaign.campaign_id),
+            **self._adset_payload(campaign, status, asset_type, final_budget, og),
+            "access_token": self.user_access_token,
+        }
+
+        self._dbg("adset.create.request", {"url": url, "payload": payload})
+        result = self._post_form(url, payload)
+        self._dbg("adset.create.response", result)
+
+        if "error" in result:
+            raise Exception(result["error"])
+
+        return self._record_adset(result["id"], campaign, status, asset_type, final_budget, title, link)
+
+    @staticmethod
+    def _adset_payload(
+        campaign: schemas.Campaign,
+        status: MetaStatus,
+        asset_type: AssetType,
+        final_budget: int,
+        optimization_goal: str,
+    ) -> dict:
+        """Adset form fields (everything except campaign_id / access_token)."""
+        ig_positions = ["stream", "story", "reels"] if asset_type == "video" else ["stream", "story"]
+        page_id = getattr(campaign, "page_id", None)
+
+        promoted_object = {"page_id": str(page_id)}
         targeting = {
             "geo_locations": {"countries": ["LB"]},
             "publisher_platforms": ["instagram"],
@@ -200,28 +395,29 @@ class AdsStairway:
             "facebook_positions": [],
         }
 
-        payload = {
+        return {
             "name": campaign.name,
-            "campaign_id": str(campaign.campaign_id),
             "daily_budget": str(final_budget),
             "billing_event": "IMPRESSIONS",
-            "optimization_goal": og,  # NEW (was: str(campaign.optimization_goal))
+            "optimization_goal": optimization_goal,
             "status": normalize_status(status),
             "promoted_object": json.dumps(promoted_object),
             "targeting": json.dumps(targeting),
             "bid_strategy": "LOWEST_COST_WITHOUT_CAP",
-            "access_token": self.user_access_token,
         }
 
-        self._dbg("adset.create.request", {"url": url, "payload": payload})
-        result = self._post_form(url, payload)
-        self._dbg("adset.create.response", result)
-
-        if "error" in result:
-            raise Exception(result["error"])
-
+    def _record_adset(
+        self,
+        adset_id: str,
+        campaign: schemas.CreatedCampaign,
+        status: MetaStatus,
+        asset_type: AssetType,
+        final_budget: int,
+        title: str | None,
+        link: str | None,
+    ) -> schemas.AdSet:
         adset = schemas.AdSet(
-            adset_id=result["id"],
+            adset_id=adset_id,
             campaign_id=campaign.campaign_id,
             ad_account_id=campaign.ad_account_id,
             name=campaign.name,
@@ -232,16 +428,117 @@ class AdsStairway:
             title=(title or "Check this out!"),
             asset_type=asset_type,
         )
-        self.adsets.append(adset)
+        self._store(self.adsets, self._next_adset, adset)
         return adset
 
+    # ---------------- CAMPAIGN + ADSET (one round-trip) ----------------
+    def _post_batch(
+        self,
+        batch: list[dict],
+        files: Optional[dict] = None,
+        *,
+        raise_on_error: bool = True,
+    ) -> list[dict]:
+        """
+        POST a Graph batch (https://graph.facebook.com/<v>/ with batch=[...]).
+        files: multipart attachments referenced by name from each operation's "attached_files".
+        Returns each sub-response body parsed; raises on the first failed operation.
+        raise_on_error=False returns failures in place as {"error": ...} bodies instead
+        (a whole-request error is repeated for every operation).
+        """
+        url = f"{self._graph_base}/"
+        payload = {"access_token": self.user_access_token, "batch": json.dumps(batch)}
+        self._dbg("batch.request", {"url": url, "batch": batch, "files": list(files or ())})
+        result = self._post_form(url, payload, files=files)
+        self._dbg("batch.response", result)
+
+        if isinstance(result, dict):
+            if raise_on_error:
+                raise Exception(result.get("error") or result)
+            return [{"error": result.get("error") or result} for _ in batch]
+
+        bodies: list[dict] = []
+        for i, item in enumerate(result):
+            if item is None:
+                # Meta returns null for operations it didn't run (an earlier dependency failed)
+                body = {"error": f"Batch operation {i} was not executed"}
+            else:
+                body = self._safe_json_loads(item.get("body") or "") or {}
+                if "error" not in body and int(item.get("code") or 0) >= 400:
+                    body = {"error": body}
+            if raise_on_error and "error" in body:
+                raise Exception(body["error"])
+            bodies.append(body)
+        return bodies
+
+    def create_campaign_and_adset(
+        self,
+        index: int,
+        campaign_status: MetaStatus = "PAUSED",
+        adset_status: MetaStatus = "PAUSED",
+        asset_type: AssetType = "video",
+        daily_budget: int | None = None,
+        title: str | None = None,
+        link: str | None = None,
+        optimization_goal: str | None = None,
+    ) -> Tuple[schemas.CreatedCampaign, schemas.AdSet]:
+        """
+        create_campaign_by_index() + create_adset() in one Graph batch request.
+        The adset references the new campaign through {result=create-campaign:$.id}.
+        Both objects are recorded exactly like the two-call path (same indices).
+        """
+        campaign = self._lookup(self.campaigns, index, "campaign")
+        act = campaign.ad_account_id
+
+        created = schemas.CreatedCampaign(
+            campaign_id="",
+            ad_account_id=act,
+            name=campaign.name,
+            objective=campaign.objective,
+            page_id=self.page_id,
+        )
+        final_budget = int(daily_budget) if daily_budget is not None else int(created.daily_budget)
+        og = (optimization_goal or created.optimization_goal or "REACH").strip().upper()
+
+        adset_body = urlencode(self._adset_payload(created, adset_status, asset_type, final_budget, og))
+        batch = [
+            {
+                "method": "POST",
+                "name": "create-campaign",
+                "relative_url": f"{act}/campaigns",
+                "body": urlencode(self._campaign_payload(campaign, campaign_status)),
+            },
+            {
+                "method": "POST",
+                "relative_url": f"{act}/adsets",
+                # JSONPath reference must stay unescaped for Meta to resolve it
+                "body": f"{adset_body}&campaign_id={{result=create-campaign:$.id}}",
+            },
+        ]
+
+        campaign_body, adset_body_resp = self._post_batch(batch, raise_on_error=False)
+
+        # record the campaign whenever Meta created it, even if the adset failed,
+        # so it keeps an index (retry create_adset / clean up) like the two-call path
+        if "id" not in campaign_body:
+            raise Exception(campaign_body.get("error") or campaign_body)
+        created.campaign_id = str(campaign_body["id"])
+        self._store(self.created_campaigns, self._next_created_campaign, created)
+
+        if "error" in adset_body_resp:
+            raise Exception(adset_body_resp["error"])
+
+        adset = self._record_adset(
+            str(adset_body_resp["id"]), created, adset_status, asset_type, final_budget, title, link
+        )
+        return created, adset
+
 
     def create_paid_ig_ad(self, adset_index: int, ad_name: str, thumbnail_url: str, status: MetaStatus):
         """
         Video ad (single).
         """
-        adset = self.adsets[adset_index]
-        url = f"https://graph.facebook.com/{self.graph_version}/{adset.ad_account_id}/adcreatives"
+        adset = self._adset(adset_index)
 
         object_story_spec = {
             "page_id": str(self.page_id),
@@ -252,57 +549,148 @@ class AdsStairway:
             },
         }
 
-        payload = {
-            "name": ad_name,
-            "object_story_spec": json.dumps(object_story_spec),
-            "access_token": self.user_access_token,
-        }
+        return self._create_creative_and_ad(adset, ad_name, object_story_spec, status, tag="video")
 
-        self._dbg("creative.video.request", {"url": url, "payload": payload, "object_story_spec": object_story_spec})
-        creative = self._post_form(url, payload)
-        self._dbg("creative.video.response", creative)
+    def _create_creative_and_ad(
+        self,
+        adset: schemas.AdSet,
+        ad_name: str,
+        object_story_spec: dict,
+        status: MetaStatus,
+        *,
+        tag: str,
+    ) -> dict:
+        """
+        /adcreatives + /ads in one Graph batch request: the ad points at the new
+        creative through {result=create-creative:$.id}. Sets adset.ad_id.
+        """
+        act = adset.ad_account_id
+        creative_body = urlencode({"name": ad_name, "object_story_spec": json.dumps(object_story_spec)})
+        ad_body = urlencode(
+            {"name": ad_name, "adset_id": str(adset.adset_id), "status": normalize_status(status)}
+        )
+        batch = [
+            {
+                "method": "POST",
+                "name": "create-creative",
+                "relative_url": f"{act}/adcreatives",
+                "body": creative_body,
+            },
+            {
+                "method": "POST",
+                "relative_url": f"{act}/ads",
+                # JSONPath reference must stay unescaped for Meta to resolve it
+                "body": f'{ad_body}&creative={{"creative_id":"{{result=create-creative:$.id}}"}}',
+            },
+        ]
 
-        if "error" in creative:
-            raise Exception(creative["error"])
+        self._dbg(f"creative+ad.{tag}.object_story_spec", object_story_spec)
+        creative, ad = self._post_batch(batch)
 
-        ad_url = f"https://graph.facebook.com/{self.graph_version}/{adset.ad_account_id}/ads"
-        ad_payload = {
-            "name": ad_name,
-            "adset_id": str(adset.adset_id),
-            "creative": json.dumps({"creative_id": creative["id"]}),
-            "status": normalize_status(status),
-            "access_token": self.user_access_token,
-        }
+        adset.ad_id = ad["id"]
+        return {"ad_id": ad["id"], "creative_id": creative["id"]}
 
-        self._dbg("ad.create.video.request", {"url": ad_url, "payload": ad_payload})
-        ad = self._post_form(ad_url, ad_payload)
-        self._dbg("ad.create.video.response", ad)
+    # ---------------- BULK (one ad per adset) ----------------
+    def create_paid_ig_ads_bulk(self, items: list[dict]) -> list[dict]:
+        """
+        One ad per adset, created concurrently (BULK_AD_CONCURRENCY at a time).
 
-        if "error" in ad:
-            raise Exception(ad["error"])
+        items: [{"adset_index": int, "ad_name": str, "status": "ACTIVE"|"PAUSED",
+                 "thumbnail_url": str (video adsets) | "link_url": str (image adsets)}, ...]
 
-        adset.ad_id = ad["id"]
-        return {"ad_id": ad["id"], "creative_id": creative["id"]}
+        Returns one entry per item, in order: the create result, or {"adset_index", "error"}.
+        """
+        def create_one(item: dict) -> dict:
+            adset_index = int(item["adset_index"])
+            adset = self._adset(adset_index)
+            status = item.get("status") or "PAUSED"
+            if adset.asset_type == "image":
+                return self.create_paid_ig_image_ad(
+                    adset_index=adset_index,
+                    ad_name=item["ad_name"],
+                    status=status,
+                    link_url=item.get("link_url") or adset.link,
+                )
+            return self.create_paid_ig_ad(
+                adset_index=adset_index,
+                ad_name=item["ad_name"],
+                thumbnail_url=item.get("thumbnail_url") or "",
+                status=status,
+            )
+
+        with ThreadPoolExecutor(max_workers=BULK_AD_CONCURRENCY) as pool:
+            futures = [pool.submit(create_one, item) for item in items]
+
+        results: list[dict] = []
+        for item, fut in zip(items, futures):
+            try:
+                results.append(fut.result())
+            except Exception as e:
+                results.append({"adset_index": item.get("adset_index"), "error": str(e)})
+        return results
 
     # ---------------- IMAGE (SINGLE) ----------------
     def upload_ad_image(self, adset_index: int, image_path: str) -> str:
         """
         Upload local image to adimages and return image_hash.
+        Content already uploaded to the ad account (same bytes, any file name) is not sent
+        again; concurrent calls for the same content wait for the first upload.
+        Shares its cache with upload_ad_images_batch().
         """
-        adset = self.adsets[adset_index]
-        endpoint = f"https://graph.facebook.com/{self.graph_version}/{adset.ad_account_id}/adimages"
+        adset = self._adset(adset_index)
+        key = (adset.ad_account_id, _file_digest(image_path))
+
+        with self._lock:
+            image_hash = self._image_hash_by_digest.get(key)
+            fut = None if image_hash is not None else self._image_hash_inflight.get(key)
+            owner = image_hash is None and fut is None
+            if owner:
+                fut = self._image_hash_inflight[key] = Future()
+
+        if not owner:
+            if image_hash is None:
+                image_hash = fut.result()
+            self._image_hash_by_adset_id[adset.adset_id] = image_hash
+            return image_hash
 
-        filename = os.path.basename(image_path)
-        mime = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        try:
+            with open(image_path, "rb") as f:
+                image_hash = self.upload_ad_image_fileobj(adset_index, f, os.path.basename(image_path))
+        except BaseException as e:
+            with self._lock:
+                self._image_hash_inflight.pop(key, None)
+            fut.set_exception(e)
+            raise
+
+        with self._lock:
+            self._image_hash_by_digest[key] = image_hash
+            self._image_hash_inflight.pop(key, None)
+        fut.set_result(image_hash)
+        return image_hash
+
+    def upload_ad_image_fileobj(
+        self,
+        adset_index: int,
+        fileobj: BinaryIO,
+        filename: str,
+        content_type: Optional[str] = None,
+    ) -> str:
+        """
+        Upload image bytes straight from any file object (e.g. UploadFile.file, BytesIO)
+        to adimages and return image_hash. No temp file / public hosting round-trip.
+        """
+        adset = self._adset(adset_index)
+        endpoint = f"{self._graph_base}/{adset.ad_account_id}/adimages"
+
+        mime = content_type or _guess_mime(filename)
 
         self._dbg("upload_ad_image.request", {"endpoint": endpoint, "filename": filename, "mime": mime})
 
-        with open(image_path, "rb") as f:
-            files = {"filename": (filename, f, mime)}
-            params = {"access_token": self.user_access_token}
-            r = requests.post(endpoint, params=params, files=files)
+        files = {"filename": (filename, fileobj, mime)}
+        params = {"access_token": self.user_access_token}
+        r = self._post(endpoint, params=params, files=files)
 
-        result = r.json()
+        result = _json(r)
         self._dbg("upload_ad_image.response", result)
 
         if "error" in result:
@@ -320,13 +708,11 @@ class AdsStairway:
         status: MetaStatus,
         link_url: str,
     ):
-        adset = self.adsets[adset_index]
+        adset = self._adset(adset_index)
         image_hash = self._image_hash_by_adset_id.get(adset.adset_id)
         if not image_hash:
             raise Exception("Missing image_hash (upload_ad_image first)")
 
-        creative_url = f"https://graph.facebook.com/{self.graph_version}/{adset.ad_account_id}/adcreatives"
-
         object_story_spec = {
             "page_id": str(self.page_id),
             "instagram_user_id": str(self.instagram_actor_id),
@@ -336,37 +722,7 @@ class AdsStairway:
             },
         }
 
-        payload = {
-            "name": ad_name,
-            "object_story_spec": json.dumps(object_story_spec),
-            "access_token": self.user_access_token,
-        }
-
-        self._dbg("creative.image.request", {"url": creative_url, "payload": payload, "object_story_spec": object_story_spec})
-        creative = self._post_form(creative_url, payload)
-        self._dbg("creative.image.response", creative)
-
-        if "error" in creative:
-            raise Exception(creative["error"])
-
-        ad_url = f"https://graph.facebook.com/{self.graph_version}/{adset.ad_account_id}/ads"
-        ad_payload = {
-            "name": ad_name,
-            "adset_id": str(adset.adset_id),
-            "creative": json.dumps({"creative_id": creative["id"]}),
-            "status": normalize_status(status),
-            "access_token": self.user_access_token,
-        }
-
-        self._dbg("ad.create.image.request", {"url": ad_url, "payload": ad_payload})
-        ad = self._post_form(ad_url, ad_payload)
-        self._dbg("ad.create.image.response", ad)
-
-        if "error" in ad:
-            raise Exception(ad["error"])
-
-        adset.ad_id = ad["id"]
-        return {"ad_id": ad["id"], "creative_id": creative["id"]}
+        return self._create_creative_and_ad(adset, ad_name, object_story_spec, status, tag="image")
 
     # =========================
     # CAROUSEL UPLOAD HELPERS
@@ -384,23 +740,92 @@ class AdsStairway:
             hashes.append(h)
             self._dbg("carousel.upload_images.progress", {"i": i, "path": p, "hash": h, "hashes_so_far": hashes})
 
-        adset = self.adsets[adset_index]
+        adset = self._adset(adset_index)
         self._carousel_hashes_by_adset_id[adset.adset_id] = hashes
 
         self._dbg("carousel.upload_images.output", {"adset_id": adset.adset_id, "hashes": hashes})
         return hashes
+
+
+    def _post_image_batch(self, relative_url: str, paths: list[str]) -> list[dict]:
+        # one adimages operation per file, each attached as a multipart part
+        batch: list[dict] = []
+        files: dict = {}
+        with ExitStack() as stack:
+            for j, path in enumerate(paths):
+                name = f"file{j}"
+                filename = os.path.basename(path)
+                files[name] = (filename, stack.enter_context(open(path, "rb")), _guess_mime(filename))
+                batch.append({"method": "POST", "relative_url": relative_url, "attached_files": name})
+            return self._post_batch(batch, files=files, raise_on_error=False)
+
+    def upload_ad_images_batch(self, adset_index: int, image_paths: list[str]) -> list[str]:
+        """
+        upload_ad_images() over Graph batch requests: up to GRAPH_BATCH_MAX images per POST,
+        each attached as a multipart file, so an N-image carousel is one round-trip
+        instead of N. Files with identical content (same image picked twice, copies under
+        another name) are uploaded once and share the hash. Operations throttled by Graph
+        (_THROTTLE_CODES) are resent with backoff. Hashes come back in image_paths order.
+        """
+        adset = self._adset(adset_index)
+        relative_url = f"{adset.ad_account_id}/adimages"
+        self._dbg("carousel.upload_images_batch.input", {"adset_index": adset_index, "image_paths": image_paths})
+
+        keys = [(adset.ad_account_id, _file_digest(p)) for p in image_paths]
+        with self._lock:
+            known = dict(self._image_hash_by_digest)
+        pending: dict[tuple[str, str], str] = {}
+        for key, path in zip(keys, image_paths):
+            if key not in known and key not in pending:
+                pending[key] = path
+
+        todo = list(pending.items())
+        for start in range(0, len(todo), GRAPH_BATCH_MAX):
+            chunk = todo[start:start + GRAPH_BATCH_MAX]
+            delay = BATCH_THROTTLE_DELAY_S
+            for attempt in range(BATCH_THROTTLE_RETRIES + 1):
+                bodies = self._post_image_batch(relative_url, [path for _, path in chunk])
+
+                throttled: list[tuple[tuple[str, str], str]] = []
+                for (key, path), body in zip(chunk, bodies):
+                    if "error" not in body:
+                        known[key] = next(iter(body["images"].values()))["hash"]
+                    elif _is_throttled(body["error"]) and attempt < BATCH_THROTTLE_RETRIES:
+                        throttled.append((key, path))
+                    else:
+                        raise Exception(body["error"])
+                if not throttled:
+                    break
+
+                # resend only the throttled uploads, with exponential backoff + jitter
+                self._dbg("carousel.upload_images_batch.throttled", {"attempt": attempt + 1, "count": len(throttled)})
+                time.sleep(delay + random.uniform(0, delay / 2))
+                delay *= 2
+                chunk = throttled
+
+        with self._lock:
+            self._image_hash_by_digest.update(known)
+
+        hashes = [known[key] for key in keys]
+        self._carousel_hashes_by_adset_id[adset.adset_id] = hashes
+        self._dbg(
+            "carousel.upload_images_batch.output",
+            {"adset_id": adset.adset_id, "hashes": hashes, "uploaded": len(todo)},
+        )
+        return hashes
+
     def upload_ad_video(self, adset_index: int, video_url: str, name: str = "Hosted Upload") -> str:
         """
         Upload a video to the ad account using a PUBLIC hosted URL (Spaces/CDN).
         Returns video_id and stores it on the adset (adset.video_id) for create_paid_ig_ad().
         """
-        adset = self.adsets[adset_index]
+        adset = self._adset(adset_index)
         ad_account_id = adset.ad_account_id  # already "act_..."
 
         if not (video_url or "").strip():
             raise ValueError("video_url is required (hosted public URL).")
 
-        endpoint = f"https://graph.facebook.com/{self.graph_version}/{ad_account_id}/advideos"
+        endpoint = f"{self._graph_base}/{ad_account_id}/advideos"
 
         payload = {
             "access_token": self.user_access_token,
@@ -409,10 +834,10 @@ class AdsStairway:
         }
 
         self._dbg("upload_ad_video.request", {"endpoint": endpoint, "payload": {**payload, "access_token": "REDACTED"}})
-        r = requests.post(endpoint, data=payload, timeout=120)
+        r = self._post(endpoint, data=payload, timeout=120)
 
         try:
-            result = r.json()
+            result = _json(r)
         except Exception:
             result = {"_raw": r.text}
 
@@ -434,24 +859,31 @@ class AdsStairway:
         Upload local video to the ad account (advideos) and return video_id.
         Useful for carousel video cards if you do not want to host videos publicly.
         """
-        adset = self.adsets[adset_index]
+        adset = self._adset(adset_index)
         ad_account_id = adset.ad_account_id
 
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video not found: {video_path}")
 
-        endpoint = f"https://graph.facebook.com/{self.graph_version}/{ad_account_id}/advideos"
+        endpoint = f"{self._graph_base}/{ad_account_id}/advideos"
         filename = os.path.basename(video_path)
-        mime = mimetypes.guess_type(filename)[0] or "video/mp4"
+        mime = _guess_mime(filename, default="video/mp4")
 
         self._dbg("upload_ad_video_to_account.request", {"endpoint": endpoint, "filename": filename, "mime": mime})
 
         f = open(video_path, "rb")
         try:
-            files = {"source": (filename, f, mime)}
-            data = {"access_token": self.user_access_token}
-            r = requests.post(endpoint, data=data, files=files, timeout=120)
-            result = r.json()
+            if HAS_TOOLBELT:
+                # streamed multipart: the body is read from disk as it is sent (RSS stays ~chunk size)
+                m = MultipartEncoder(
+                    fields={"access_token": self.user_access_token, "source": (filename, f, mime)}
+                )
+                r = self._post(endpoint, data=m, headers={"Content-Type": m.content_type}, timeout=120)
+            else:
+                files = {"source": (filename, f, mime)}
+                data = {"access_token": self.user_access_token}
+                r = self._post(endpoint, data=data, files=files, timeout=120)
+            result = _json(r)
             self._dbg("upload_ad_video_to_account.response", result)
 
             if "error" in result:
@@ -556,16 +988,19 @@ class AdsStairway:
     @staticmethod
     def _safe_json_loads(s: str):
         try:
-            return json.loads(s)
+            return orjson.loads(s) if HAS_ORJSON else json.loads(s)
         except Exception:
             return {"_raw": s}
 
     def _dbg_request_packet(self, tag: str, url: str, payload: dict) -> None:
         """
-        Logs EXACTLY what you're sending to requests.post(...).
+        Logs EXACTLY what you're sending to _post(...).
         - If you use form payload (data=), it prints keys + parsed object_story_spec.
         - If you use json payload (json=), it prints the dict directly.
         """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+
         pkt = {"url": url}
 
         # copy without mutating original
@@ -602,6 +1037,9 @@ class AdsStairway:
         Logs child_attachments count and whether any interactive_components_spec exists anywhere.
         This is specifically to diagnose mismatch errors.
         """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+
         link_data = (object_story_spec or {}).get("link_data") or {}
         cards = link_data.get("child_attachments") or []
         has_interactive_top = "interactive_components_spec" in (object_story_spec or {})
@@ -626,20 +1064,20 @@ class AdsStairway:
         image_hashes: list[str],
         link_url: str | None = None,
     ) -> str:
-        adset = self.adsets[adset_index]
+        adset = self._adset(adset_index)
 
         if not image_hashes or len(image_hashes) < 2:
             raise Exception("Carousel requires at least 2 image hashes")
 
         if len(set(image_hashes)) != len(image_hashes):
-            print("[WARN] Duplicate image hashes detected in carousel. Consider using different images.")
+            logger.warning("Duplicate image hashes detected in carousel. Consider using different images.")
 
         final_link = link_url or getattr(adset, "link", None) or "https://www.instagram.com/"
         message = getattr(adset, "title", None) or ad_name
 
         child_attachments = [{"image_hash": h, "link": final_link} for h in image_hashes]
 
-        url = f"https://graph.facebook.com/{self.graph_version}/{adset.ad_account_id}/adcreatives"
+        url = f"{self._graph_base}/{adset.ad_account_id}/adcreatives"
 
         payload = {
             "name": ad_name,
@@ -668,9 +1106,9 @@ class AdsStairway:
         self._dbg_request_packet("carousel.working.request.packet", url, payload)
         # ------------------------------------------------------------
 
-        resp = requests.post(url, json=payload)
+        resp = self._post(url, json=payload)
         try:
-            result = resp.json()
+            result = _json(resp)
         except Exception:
             result = {"_raw": resp.text}
 
@@ -701,8 +1139,8 @@ class AdsStairway:
             link_url=link_url,
         )
 
-        adset = self.adsets[adset_index]
-        url = f"https://graph.facebook.com/{self.graph_version}/{adset.ad_account_id}/ads"
+        adset = self._adset(adset_index)
+        url = f"{self._graph_base}/{adset.ad_account_id}/ads"
 
         payload = {
             "name": ad_name,
@@ -725,9 +1163,9 @@ class AdsStairway:
         })
         # --------------------------------
 
-        resp = requests.post(url, json=payload)
+        resp = self._post(url, json=payload)
         try:
-            result = resp.json()
+            result = _json(resp)
         except Exception:
             result = {"_raw": resp.text}
 
@@ -753,7 +1191,7 @@ class AdsStairway:
     status: MetaStatus = "PAUSED",
     link_url: Optional[str] = None,
 ) -> dict:
-            adset = self.adsets[adset_index]
+            adset = self._adset(adset_index)
 
             if not child_attachments or len(child_attachments) < 2:
                 raise Exception("Mixed carousel requires at least 2 cards")
@@ -802,7 +1240,7 @@ class AdsStairway:
             })
 
             # -------- create creative (JSON) --------
-            creative_url = f"https://graph.facebook.com/{self.graph_version}/{adset.ad_account_id}/adcreatives"
+            creative_url = f"{self._graph_base}/{adset.ad_account_id}/adcreatives"
 
             object_story_spec = {
                 "page_id": str(self.page_id),
@@ -828,9 +1266,9 @@ class AdsStairway:
                 "object_story_spec": object_story_spec,
             })
 
-            creative_resp = requests.post(creative_url, json=creative_payload)
+            creative_resp = self._post(creative_url, json=creative_payload)
             self._dbg("carousel.mixed.json.creative.http", {"status_code": creative_resp.status_code})
-            creative = creative_resp.json()
+            creative = _json(creative_resp)
             self._dbg("carousel.mixed.json.creative.response", creative)
 
             if "error" in creative:
@@ -839,7 +1277,7 @@ class AdsStairway:
             creative_id = str(creative["id"])
 
             # -------- create ad (JSON) --------
-            ad_url = f"https://graph.facebook.com/{self.graph_version}/{adset.ad_account_id}/ads"
+            ad_url = f"{self._graph_base}/{adset.ad_account_id}/ads"
             ad_payload = {
                 "name": ad_name,
                 "adset_id": str(adset.adset_id),
@@ -849,9 +1287,9 @@ class AdsStairway:
             }
 
             self._dbg("carousel.mixed.json.ad.request", {"url": ad_url, "payload": {**ad_payload, "access_token": "REDACTED"}})
-            ad_resp = requests.post(ad_url, json=ad_payload)
+            ad_resp = self._post(ad_url, json=ad_payload)
             self._dbg("carousel.mixed.json.ad.http", {"status_code": ad_resp.status_code})
-            ad = ad_resp.json()
+            ad = _json(ad_resp)
             self._dbg("carousel.mixed.json.ad.response", ad)
 
             if "error" in ad:
@@ -878,3 +1316,21 @@ class AdsStairway:
             status=status,
             link_url=link_url,
         )
+
+    # ---------------- ASYNC WRAPPERS ----------------
+    # Graph calls go through the pooled requests session (blocking); run them on the default
+    # thread pool so callers can gather several uploads from one event loop.
+    async def upload_ad_image_async(self, adset_index: int, image_path: str) -> str:
+        return await asyncio.to_thread(self.upload_ad_image, adset_index, image_path)
+
+    async def upload_ad_image_fileobj_async(
+        self,
+        adset_index: int,
+        fileobj: BinaryIO,
+        filename: str,
+        content_type: Optional[str] = None,
+    ) -> str:
+        return await asyncio.to_thread(self.upload_ad_image_fileobj, adset_index, fileobj, filename, content_type)
+
+    async def upload_ad_video_async(self, adset_index: int, video_url: str, name: str = "Hosted Upload") -> str:
+        return await asyncio.to_thread(self.upload_ad_video, adset_index, video_url, name)
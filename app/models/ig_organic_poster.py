@@ -1,24 +1,87 @@
 # app/routers/organic_poster.py
 from __future__ import annotations
 
+import asyncio
 import os
-import time
-import requests
-from typing import List, Optional
+import random
+import re
+import httpx
+from functools import lru_cache
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Body, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse
 
+from app.config import env_float, env_int
 from app.models.schemas import OrganicPost, CarouselItem
+from app.models.organic_post_store import OrganicPostStore
 from app.routers.DB_helpers.meta_token_db_reader import MetaTokenDbReader
 
-router = APIRouter()
+# Optional dependencies (graceful)
+try:
+    import orjson  # type: ignore
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+try:
+    import h2  # type: ignore  # noqa: F401  (httpx[http2])
+    HAS_H2 = True
+except Exception:
+    HAS_H2 = False
+
+router = APIRouter(default_response_class=ORJSONResponse if HAS_ORJSON else JSONResponse)
 GRAPH_API_VERSION = "v17.0"
+_GRAPH_BASE = f"https://graph.facebook.com/{GRAPH_API_VERSION}"
+
+# Index -> post store (in-memory list, or Redis when REDIS_URL is set so all workers share it)
+organic_posts = OrganicPostStore.from_env(key_prefix="ig_organic_post")
+
+# Status poll: exponential backoff + jitter (1s, 1.7s, 2.9s, ... capped at 30s; ~5 min budget)
+MAX_RETRIES = env_int("IG_STATUS_MAX_RETRIES", 15)
+RETRY_DELAY = env_float("IG_STATUS_RETRY_DELAY_S", 1.0)
+RETRY_DELAY_MAX = env_float("IG_STATUS_RETRY_DELAY_MAX_S", 30.0)
+RETRY_BACKOFF = 1.7
+
+# Concurrent publishes in a batch call (stays well inside Meta's per-user rate limits)
+PUBLISH_BATCH_CONCURRENCY = 8
+
+# One shared async Graph client per event loop: keep-alive + HTTP/2 multiplexing.
+# (Pooled connections are bound to the loop that opened them, so a console run that
+# calls asyncio.run() again gets a fresh client instead of a dead pool.)
+_graph_http: Optional[httpx.AsyncClient] = None
+_graph_http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _aclose_quietly(client: httpx.AsyncClient) -> None:
+    try:
+        await client.aclose()
+    except Exception:
+        pass  # its connections may belong to an already-closed loop
+
+
+def _graph_client() -> httpx.AsyncClient:
+    global _graph_http, _graph_http_loop
+    loop = asyncio.get_running_loop()
+    if _graph_http is None or _graph_http_loop is not loop:
+        if _graph_http is not None:
+            # stale client from a previous loop: release its pool instead of leaking it
+            loop.create_task(_aclose_quietly(_graph_http))
+        _graph_http = httpx.AsyncClient(
+            http2=HAS_H2,
+            timeout=60,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+        _graph_http_loop = loop
+    return _graph_http
 
-# In-memory list (kept for backward compatibility with your pipeline)
-organic_posts: List[OrganicPost] = []
 
-MAX_RETRIES = 20
-RETRY_DELAY = 5
+async def aclose_graph_client() -> None:
+    """Close the shared client; call at the end of an asyncio.run() that used this module."""
+    global _graph_http, _graph_http_loop
+    client, _graph_http, _graph_http_loop = _graph_http, None, None
+    if client is not None:
+        await _aclose_quietly(client)
 
 
 # ---------------------------------------------------------------------
@@ -29,7 +92,11 @@ RETRY_DELAY = 5
 PUBLIC_BASE_URL = (os.getenv("PUBLIC_BASE_URL") or os.getenv("DROPLET_PUBLIC_BASE_URL") or "").strip().rstrip("/")
 NGROK_BASE_URL = (os.getenv("NGROK_BASE_URL") or "").strip().rstrip("/")
 
+_ABSOLUTE_URL_RE = re.compile(r"^https?://", re.IGNORECASE)
 
+
+# Pure function of the URL (+ module-level bases): memoize, carousels hit the same URLs repeatedly
+@lru_cache(maxsize=512)
 def _normalize_public_media_url(url: Optional[str]) -> Optional[str]:
     if not url:
         return url
@@ -39,7 +106,7 @@ def _normalize_public_media_url(url: Optional[str]) -> Optional[str]:
         return u
 
     # Already a public URL (Spaces/CDN/etc.)
-    if u.startswith("http://") or u.startswith("https://"):
+    if _ABSOLUTE_URL_RE.match(u):
         if NGROK_BASE_URL and PUBLIC_BASE_URL and u.startswith(NGROK_BASE_URL):
             return PUBLIC_BASE_URL + u[len(NGROK_BASE_URL):]
         return u
@@ -59,12 +126,20 @@ def _normalize_public_media_url(url: Optional[str]) -> Optional[str]:
 # ---------------------------------------------------------------------
 # META HELPERS
 # ---------------------------------------------------------------------
+def _json(resp: httpx.Response) -> Any:
+    # orjson is several times faster than stdlib json on Graph responses (polled up to MAX_RETRIES times)
+    if HAS_ORJSON:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+
 def _load_page_access_token_and_ig_user_id(
     client_id: str,
     page_id: str,
     database_url: str,
     fernet_key: str,
 ) -> tuple[str, str]:
+    # blocking DB round-trips: the async handlers run this via asyncio.to_thread
     reader = MetaTokenDbReader(database_url=database_url, fernet_key=fernet_key)
 
     page_token_row = reader.get_active_page_token(client_id=client_id, page_id=page_id)
@@ -88,14 +163,20 @@ def _load_page_access_token_and_ig_user_id(
     return page_access_token, str(ig_user_id)
 
 
-def _wait_until_media_finished(creation_id: str, page_access_token: str) -> None:
-    status_url = (
-        f"https://graph.facebook.com/{GRAPH_API_VERSION}/{creation_id}"
-        f"?fields=status_code&access_token={page_access_token}"
+async def _wait_until_media_finished(creation_id: str, page_access_token: str) -> None:
+    # token goes in the Authorization header, so it never appears in a URL that proxies/servers log
+    client = _graph_client()
+    status_req = client.build_request(
+        "GET",
+        f"{_GRAPH_BASE}/{creation_id}",
+        params={"fields": "status_code"},
+        headers={"Authorization": f"OAuth {page_access_token}"},
+        timeout=60,
     )
 
+    delay = RETRY_DELAY
     for _ in range(MAX_RETRIES):
-        status_resp = requests.get(status_url, timeout=60).json()
+        status_resp = _json(await client.send(status_req))
         if "error" in status_resp:
             raise HTTPException(status_code=400, detail=status_resp["error"])
 
@@ -105,11 +186,21 @@ def _wait_until_media_finished(creation_id: str, page_access_token: str) -> None
         if status == "ERROR":
             raise HTTPException(status_code=400, detail="Media failed to process")
 
-        time.sleep(RETRY_DELAY)
+        await asyncio.sleep(delay + random.uniform(0, 0.5))
+        delay = min(delay * RETRY_BACKOFF, RETRY_DELAY_MAX)
 
     raise HTTPException(status_code=400, detail="Media not ready after multiple attempts")
 
 
+# The *_post() coroutines work on the OrganicPost itself (console pipeline, no store);
+# the index-keyed routes wrap them with a store read + write-back.
+def _get_post(organic_post_index: int) -> OrganicPost:
+    try:
+        return organic_posts[organic_post_index]
+    except IndexError:
+        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
+
+
 def _item_type_url(item) -> tuple[str, Optional[str]]:
     if hasattr(item, "type"):
         return (item.type or "").strip().lower(), getattr(item, "url", None)
@@ -121,28 +212,23 @@ def _item_type_url(item) -> tuple[str, Optional[str]]:
 # ---------------------------------------------------------------------
 # VIDEO (REEL)
 # ---------------------------------------------------------------------
-@router.post("/organic/upload-video-instagram/{organic_post_index}")
-def upload_video_instagram(
+async def upload_video_post(
     client_id: str,
     page_id: str,
-    organic_post_index: int,
+    post: OrganicPost,
     database_url: str,
     fernet_key: str,
 ):
-    if organic_post_index >= len(organic_posts):
-        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
-
-    post = organic_posts[organic_post_index]
     if not post.video_url:
         raise HTTPException(status_code=400, detail="video_url not set")
 
-    page_access_token, ig_user_id = _load_page_access_token_and_ig_user_id(
-        client_id, page_id, database_url, fernet_key
+    page_access_token, ig_user_id = await asyncio.to_thread(
+        _load_page_access_token_and_ig_user_id, client_id, page_id, database_url, fernet_key
     )
 
     video_url = _normalize_public_media_url(post.video_url)
 
-    endpoint = f"https://graph.facebook.com/{GRAPH_API_VERSION}/{ig_user_id}/media"
+    endpoint = f"{_GRAPH_BASE}/{ig_user_id}/media"
     payload = {
         "media_type": "REELS",
         "video_url": video_url,
@@ -150,7 +236,7 @@ def upload_video_instagram(
         "access_token": page_access_token,
     }
 
-    resp = requests.post(endpoint, data=payload, timeout=60).json()
+    resp = _json(await _graph_client().post(endpoint, data=payload, timeout=60))
     if "error" in resp:
         raise HTTPException(status_code=400, detail=resp["error"])
 
@@ -158,33 +244,74 @@ def upload_video_instagram(
     return {"message": "Instagram video container created", "creation_id": post.creation_id}
 
 
-@router.post("/organic/publish-video-instagram/{organic_post_index}")
-def publish_video_instagram(
+@router.post("/organic/upload-video-instagram/{organic_post_index}")
+async def upload_video_instagram(
     client_id: str,
     page_id: str,
     organic_post_index: int,
     database_url: str,
     fernet_key: str,
 ):
-    if organic_post_index >= len(organic_posts):
-        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
+    post = _get_post(organic_post_index)
+    result = await upload_video_post(client_id, page_id, post, database_url, fernet_key)
+    organic_posts[organic_post_index] = post
+    return result
+
+
+# Registered before /{organic_post_index} so "batch" isn't captured as an index
+@router.post("/organic/publish-video-instagram/batch")
+async def publish_video_instagram_batch(
+    client_id: str,
+    page_id: str,
+    database_url: str,
+    fernet_key: str,
+    organic_post_indices: List[int] = Body(...),
+):
+    """
+    Publish several reels at once: the status polls overlap, so the batch takes
+    ~max(wait) instead of sum(wait). Per-post failures are reported, not raised.
+    """
+    sem = asyncio.Semaphore(PUBLISH_BATCH_CONCURRENCY)
+
+    async def guarded(i: int):
+        async with sem:
+            return await publish_video_instagram(client_id, page_id, i, database_url, fernet_key)
+
+    results = await asyncio.gather(*(guarded(i) for i in organic_post_indices), return_exceptions=True)
+
+    out: list[dict[str, Any]] = []
+    for i, res in zip(organic_post_indices, results):
+        if isinstance(res, HTTPException):
+            out.append({"organic_post_index": i, "error": res.detail})
+        elif isinstance(res, Exception):
+            out.append({"organic_post_index": i, "error": str(res)})
+        else:
+            out.append({"organic_post_index": i, **res})
+    return {"results": out}
+
 
-    post = organic_posts[organic_post_index]
+async def publish_video_post(
+    client_id: str,
+    page_id: str,
+    post: OrganicPost,
+    database_url: str,
+    fernet_key: str,
+):
     if not post.creation_id:
         raise HTTPException(status_code=400, detail="Creation ID not set")
 
-    page_access_token, ig_user_id = _load_page_access_token_and_ig_user_id(
-        client_id, page_id, database_url, fernet_key
+    page_access_token, ig_user_id = await asyncio.to_thread(
+        _load_page_access_token_and_ig_user_id, client_id, page_id, database_url, fernet_key
     )
 
-    _wait_until_media_finished(post.creation_id, page_access_token)
+    await _wait_until_media_finished(post.creation_id, page_access_token)
 
-    publish_url = f"https://graph.facebook.com/{GRAPH_API_VERSION}/{ig_user_id}/media_publish"
-    resp = requests.post(
+    publish_url = f"{_GRAPH_BASE}/{ig_user_id}/media_publish"
+    resp = _json(await _graph_client().post(
         publish_url,
         data={"creation_id": post.creation_id, "access_token": page_access_token},
         timeout=60,
-    ).json()
+    ))
 
     if "error" in resp:
         raise HTTPException(status_code=400, detail=resp["error"])
@@ -193,31 +320,41 @@ def publish_video_instagram(
     return {"message": "Instagram video published", "instagram_post_id": post.instagram_post_id}
 
 
+@router.post("/organic/publish-video-instagram/{organic_post_index}")
+async def publish_video_instagram(
+    client_id: str,
+    page_id: str,
+    organic_post_index: int,
+    database_url: str,
+    fernet_key: str,
+):
+    post = _get_post(organic_post_index)
+    result = await publish_video_post(client_id, page_id, post, database_url, fernet_key)
+    organic_posts[organic_post_index] = post
+    return result
+
+
 # ---------------------------------------------------------------------
 # IMAGE (SINGLE)
 # ---------------------------------------------------------------------
-def upload_photo_instagram(
+async def upload_photo_post(
     client_id: str,
     page_id: str,
-    organic_post_index: int,
+    post: OrganicPost,
     database_url: str,
     fernet_key: str,
 ):
-    if organic_post_index >= len(organic_posts):
-        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
-
-    post = organic_posts[organic_post_index]
     if not post.image_url:
         raise HTTPException(status_code=400, detail="image_url not set")
 
-    page_access_token, ig_user_id = _load_page_access_token_and_ig_user_id(
-        client_id, page_id, database_url, fernet_key
+    page_access_token, ig_user_id = await asyncio.to_thread(
+        _load_page_access_token_and_ig_user_id, client_id, page_id, database_url, fernet_key
     )
 
     image_url = _normalize_public_media_url(post.image_url)
 
-    endpoint = f"https://graph.facebook.com/{GRAPH_API_VERSION}/{ig_user_id}/media"
-    resp = requests.post(
+    endpoint = f"{_GRAPH_BASE}/{ig_user_id}/media"
+    resp = _json(await _graph_client().post(
         endpoint,
         data={
             "image_url": image_url,
@@ -225,7 +362,7 @@ def upload_photo_instagram(
             "access_token": page_access_token,
         },
         timeout=60,
-    ).json()
+    ))
 
     if "error" in resp:
         raise HTTPException(status_code=400, detail=resp["error"])
@@ -234,32 +371,41 @@ def upload_photo_instagram(
     return {"message": "Instagram photo container created", "creation_id": post.creation_id}
 
 
-def publish_photo_instagram(
+async def upload_photo_instagram(
     client_id: str,
     page_id: str,
     organic_post_index: int,
     database_url: str,
     fernet_key: str,
 ):
-    if organic_post_index >= len(organic_posts):
-        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
+    post = _get_post(organic_post_index)
+    result = await upload_photo_post(client_id, page_id, post, database_url, fernet_key)
+    organic_posts[organic_post_index] = post
+    return result
+
 
-    post = organic_posts[organic_post_index]
+async def publish_photo_post(
+    client_id: str,
+    page_id: str,
+    post: OrganicPost,
+    database_url: str,
+    fernet_key: str,
+):
     if not post.creation_id:
         raise HTTPException(status_code=400, detail="Creation ID not set")
 
-    page_access_token, ig_user_id = _load_page_access_token_and_ig_user_id(
-        client_id, page_id, database_url, fernet_key
+    page_access_token, ig_user_id = await asyncio.to_thread(
+        _load_page_access_token_and_ig_user_id, client_id, page_id, database_url, fernet_key
     )
 
-    _wait_until_media_finished(post.creation_id, page_access_token)
+    await _wait_until_media_finished(post.creation_id, page_access_token)
 
-    publish_url = f"https://graph.facebook.com/{GRAPH_API_VERSION}/{ig_user_id}/media_publish"
-    resp = requests.post(
+    publish_url = f"{_GRAPH_BASE}/{ig_user_id}/media_publish"
+    resp = _json(await _graph_client().post(
         publish_url,
         data={"creation_id": post.creation_id, "access_token": page_access_token},
         timeout=60,
-    ).json()
+    ))
 
     if "error" in resp:
         raise HTTPException(status_code=400, detail=resp["error"])
@@ -268,25 +414,34 @@ def publish_photo_instagram(
     return {"message": "Instagram photo published", "instagram_post_id": post.instagram_post_id}
 
 
+async def publish_photo_instagram(
+    client_id: str,
+    page_id: str,
+    organic_post_index: int,
+    database_url: str,
+    fernet_key: str,
+):
+    post = _get_post(organic_post_index)
+    result = await publish_photo_post(client_id, page_id, post, database_url, fernet_key)
+    organic_posts[organic_post_index] = post
+    return result
+
+
 # ---------------------------------------------------------------------
 # CAROUSEL
 # ---------------------------------------------------------------------
-def upload_carousel_instagram(
+async def upload_carousel_post(
     client_id: str,
     page_id: str,
-    organic_post_index: int,
+    post: OrganicPost,
     database_url: str,
     fernet_key: str,
 ):
-    if organic_post_index >= len(organic_posts):
-        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
-
-    post = organic_posts[organic_post_index]
     if not post.carousel_items:
         raise HTTPException(status_code=400, detail="carousel_items not set")
 
-    page_access_token, ig_user_id = _load_page_access_token_and_ig_user_id(
-        client_id, page_id, database_url, fernet_key
+    page_access_token, ig_user_id = await asyncio.to_thread(
+        _load_page_access_token_and_ig_user_id, client_id, page_id, database_url, fernet_key
     )
 
     child_ids: list[str] = []
@@ -296,7 +451,7 @@ def upload_carousel_instagram(
         media_type, raw_url = _item_type_url(item)
         media_url = _normalize_public_media_url(raw_url)
 
-        endpoint = f"https://graph.facebook.com/{GRAPH_API_VERSION}/{ig_user_id}/media"
+        endpoint = f"{_GRAPH_BASE}/{ig_user_id}/media"
 
         if media_type == "image":
             payload = {
@@ -314,7 +469,7 @@ def upload_carousel_instagram(
         else:
             raise HTTPException(400, f"Unsupported carousel media type: {media_type}")
 
-        resp = requests.post(endpoint, data=payload, timeout=90).json()
+        resp = _json(await _graph_client().post(endpoint, data=payload, timeout=90))
         if "error" in resp:
             raise HTTPException(status_code=400, detail=resp["error"])
 
@@ -322,11 +477,11 @@ def upload_carousel_instagram(
 
     # STEP 2 — wait
     for cid in child_ids:
-        _wait_until_media_finished(cid, page_access_token)
+        await _wait_until_media_finished(cid, page_access_token)
 
     # STEP 3 — parent
-    parent_endpoint = f"https://graph.facebook.com/{GRAPH_API_VERSION}/{ig_user_id}/media"
-    parent_resp = requests.post(
+    parent_endpoint = f"{_GRAPH_BASE}/{ig_user_id}/media"
+    parent_resp = _json(await _graph_client().post(
         parent_endpoint,
         data={
             "media_type": "CAROUSEL",
@@ -335,7 +490,7 @@ def upload_carousel_instagram(
             "access_token": page_access_token,
         },
         timeout=90,
-    ).json()
+    ))
 
     if "error" in parent_resp:
         raise HTTPException(status_code=400, detail=parent_resp["error"])
@@ -344,35 +499,57 @@ def upload_carousel_instagram(
     return {"message": "Instagram carousel container created", "creation_id": post.creation_id}
 
 
-def publish_carousel_instagram(
+async def upload_carousel_instagram(
     client_id: str,
     page_id: str,
     organic_post_index: int,
     database_url: str,
     fernet_key: str,
 ):
-    if organic_post_index >= len(organic_posts):
-        raise HTTPException(status_code=404, detail="OrganicPost index out of range")
+    post = _get_post(organic_post_index)
+    result = await upload_carousel_post(client_id, page_id, post, database_url, fernet_key)
+    organic_posts[organic_post_index] = post
+    return result
 
-    post = organic_posts[organic_post_index]
+
+async def publish_carousel_post(
+    client_id: str,
+    page_id: str,
+    post: OrganicPost,
+    database_url: str,
+    fernet_key: str,
+):
     if not post.creation_id:
         raise HTTPException(status_code=400, detail="Creation ID not set")
 
-    page_access_token, ig_user_id = _load_page_access_token_and_ig_user_id(
-        client_id, page_id, database_url, fernet_key
+    page_access_token, ig_user_id = await asyncio.to_thread(
+        _load_page_access_token_and_ig_user_id, client_id, page_id, database_url, fernet_key
     )
 
-    _wait_until_media_finished(post.creation_id, page_access_token)
+    await _wait_until_media_finished(post.creation_id, page_access_token)
 
-    publish_url = f"https://graph.facebook.com/{GRAPH_API_VERSION}/{ig_user_id}/media_publish"
-    resp = requests.post(
+    publish_url = f"{_GRAPH_BASE}/{ig_user_id}/media_publish"
+    resp = _json(await _graph_client().post(
         publish_url,
         data={"creation_id": post.creation_id, "access_token": page_access_token},
         timeout=60,
-    ).json()
+    ))
 
     if "error" in resp:
         raise HTTPException(status_code=400, detail=resp["error"])
 
     post.instagram_post_id = resp["id"]
     return {"message": "Instagram carousel published", "instagram_post_id": post.instagram_post_id}
+
+
+async def publish_carousel_instagram(
+    client_id: str,
+    page_id: str,
+    organic_post_index: int,
+    database_url: str,
+    fernet_key: str,
+):
+    post = _get_post(organic_post_index)
+    result = await publish_carousel_post(client_id, page_id, post, database_url, fernet_key)
+    organic_posts[organic_post_index] = post
+    return result
@@ -0,0 +1,135 @@
+# app/models/organic_post_store.py
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+from app.models.schemas import CarouselItem, OrganicPost
+
+# Optional dependency (graceful)
+try:
+    import redis  # type: ignore
+    HAS_REDIS = True
+except Exception:
+    HAS_REDIS = False
+
+
+class OrganicPostStore:
+    """
+    Index -> OrganicPost store used by the organic routers.
+
+    Backends:
+      - in-memory (default): idx -> post, capped at max_items; the oldest post is evicted
+        first and its index then raises IndexError (indices are never reused)
+      - Redis (REDIS_URL set + redis installed): one hash per post + a shared counter,
+        so every uvicorn worker / host sees the same posts. Each hash expires after
+        ttl_s, which keeps the store bounded.
+
+    List-like surface kept for the pipelines:
+      idx = store.append(post)   (also works as: store.append(post); idx = len(store) - 1)
+      post = store[idx]          (IndexError if unknown)
+      store[idx] = post          (write back after mutating the post)
+    """
+
+    def __init__(
+        self,
+        *,
+        redis_url: Optional[str] = None,
+        key_prefix: str = "organic_post",
+        ttl_s: int = 7 * 24 * 3600,
+        max_items: int = 1024,
+    ) -> None:
+        self.key_prefix = key_prefix
+        self.ttl_s = ttl_s
+        self.max_items = max_items
+
+        # insertion-ordered, so the first key is always the oldest post
+        self._items: Dict[int, OrganicPost] = {}
+        self._next_idx = 0
+        self._redis: Any = None
+        if redis_url and HAS_REDIS:
+            self._redis = redis.Redis.from_url(redis_url, decode_responses=True)  # type: ignore[name-defined]
+
+    @classmethod
+    def from_env(cls, *, key_prefix: str = "organic_post") -> "OrganicPostStore":
+        return cls(redis_url=(os.getenv("REDIS_URL") or "").strip() or None, key_prefix=key_prefix)
+
+    # ----------------- list-like API -----------------
+    def append(self, post: OrganicPost) -> int:
+        if self._redis is None:
+            idx = self._next_idx
+            self._next_idx += 1
+            self._items[idx] = post
+            while len(self._items) > self.max_items:
+                del self._items[next(iter(self._items))]
+            return idx
+
+        idx = int(self._redis.incr(self._counter_key)) - 1
+        self._write(idx, post)
+        return idx
+
+    def __len__(self) -> int:
+        if self._redis is None:
+            return self._next_idx
+        return int(self._redis.get(self._counter_key) or 0)
+
+    def __getitem__(self, idx: int) -> OrganicPost:
+        if self._redis is None:
+            try:
+                return self._items[self._local_idx(idx)]
+            except KeyError:
+                raise IndexError(idx) from None
+
+        payload = self._redis.hgetall(self._post_key(idx))
+        if not payload:
+            raise IndexError(idx)
+        return self._from_hash(payload)
+
+    def __setitem__(self, idx: int, post: OrganicPost) -> None:
+        if self._redis is None:
+            local_idx = self._local_idx(idx)
+            if local_idx not in self._items:
+                raise IndexError(idx)
+            self._items[local_idx] = post
+            return
+        self._write(idx, post)
+
+    def _local_idx(self, idx: int) -> int:
+        # negative indices count from the end, like the old list
+        return idx + self._next_idx if idx < 0 else idx
+
+    # ----------------- Redis layout -----------------
+    @property
+    def _counter_key(self) -> str:
+        return f"{self.key_prefix}:counter"
+
+    def _post_key(self, idx: int) -> str:
+        return f"{self.key_prefix}:{idx}"
+
+    def _write(self, idx: int, post: OrganicPost) -> None:
+        mapping = self._to_hash(post)
+        key = self._post_key(idx)
+
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.delete(key)
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, self.ttl_s)
+        pipe.execute()
+
+    @staticmethod
+    def _to_hash(post: OrganicPost) -> Dict[str, str]:
+        data = post.model_dump(exclude_none=True)
+        if "carousel_items" in data:
+            data["carousel_items"] = json.dumps(data["carousel_items"])
+        return {k: str(v) for k, v in data.items()}
+
+    @staticmethod
+    def _from_hash(payload: Dict[str, str]) -> OrganicPost:
+        # Trusted data (we wrote it from a validated model): skip validation on the read path
+        data: Dict[str, Any] = dict(payload)
+        if "carousel_items" in data:
+            data["carousel_items"] = [
+                CarouselItem.model_construct(**item) for item in json.loads(data["carousel_items"])
+            ]
+        return OrganicPost.model_construct(**data)
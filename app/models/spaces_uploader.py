@@ -1,17 +1,29 @@
 # app/models/spaces_uploader.py
 from __future__ import annotations
 
+import asyncio
+import base64
+import hashlib
 import io
 import os
-import uuid
+import secrets
 import mimetypes
+import random
+import shutil
 import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Any, BinaryIO, Dict, Optional, Literal, Tuple
+from typing import Any, BinaryIO, Dict, Optional, Literal, Tuple, Union
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 
+from app.config import env_int
+
 # Optional dependencies (graceful)
 try:
     import cv2  # type: ignore
@@ -20,14 +32,58 @@ except Exception:
     HAS_CV2 = False
 
 try:
-    from PIL import Image  # type: ignore
+    from PIL import Image, ImageOps  # type: ignore
     HAS_PIL = True
 except Exception:
     HAS_PIL = False
 
+try:
+    import numpy as np  # type: ignore
+    from turbojpeg import TurboJPEG, TJPF_RGB  # type: ignore
+    _TURBOJPEG = TurboJPEG()
+    HAS_TURBOJPEG = True
+except Exception:
+    HAS_TURBOJPEG = False
+
 
 OrganicKind = Literal["image", "video"]
 
+# Content types for the extensions the pipelines actually upload (mimetypes as fallback)
+_EXT_CT: Dict[str, str] = {
+    ".mp4": "video/mp4",
+    ".mov": "video/quicktime",
+    ".m4v": "video/x-m4v",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+}
+
+# One boto3 client per (endpoint, region, key, secret): reuses warm HTTPS connections across uploader instances
+_CLIENT_CACHE: Dict[Tuple[str, str, str, str], Any] = {}
+_CLIENT_LOCK = threading.Lock()
+
+_MB = 1024 * 1024
+
+# Multipart tuning (uploads are network-bound: bigger parts + more parallel PUTs overlap RTT).
+# Up to _CONCURRENCY parts are held in memory at once: 8 x 32 MiB = 256 MiB per video upload at the defaults.
+_PART_SIZE = env_int("DO_SPACES_PART_SIZE_MB", 16) * _MB
+_CONCURRENCY = env_int("DO_SPACES_CONCURRENCY", 8)
+_VIDEO_PART_SIZE = max(_PART_SIZE, 32 * _MB)
+
+# Small objects: one PutObject (no Create/Complete multipart round-trips)
+_SINGLE_PART_MAX = 8 * _MB
+
+# Very large uploads (multi-GB videos) go through a manual multipart upload with per-part retry
+_LARGE_UPLOAD_THRESHOLD = 256 * _MB
+_PART_MAX_ATTEMPTS = 5
+
+# Ad videos already uploaded by this process: (bucket, content digest) -> save_ad_video() result.
+# Re-uploading the same file for another adset reuses the URLs instead of pushing the bytes again.
+_AD_VIDEO_CACHE: Dict[Tuple[str, str], Dict[str, Optional[str]]] = {}
+_AD_VIDEO_CACHE_MAX = 256
+_AD_VIDEO_CACHE_LOCK = threading.Lock()
+
 
 class SpacesUploader:
     """
@@ -37,12 +93,14 @@ class SpacesUploader:
 
     Provides:
       - upload_fileobj(...) -> public URL
+      - presign_upload(...) -> presigned PUT for direct client -> Spaces uploads
       - upload_organic_video / upload_organic_image
       - save_ad_media(upload_file) -> dict like your pipelines expect:
             video: {"video_url": ..., "thumbnail_url": ...}
             image: {"image_url": ...}
       - save_ad_image(upload_file) -> {"image_url": ...} (Meta-safe baseline JPEG if PIL available)
       - save_ad_video(upload_file) -> {"video_url": ..., "thumbnail_url": ...} (thumb if cv2 available)
+      - save_ad_media_async / save_ad_image_async / save_ad_video_async for async callers
 
     REQUIRED env (your names):
       DO_SPACE_NAME        (bucket/space name)          e.g. "aisocial-media"
@@ -54,6 +112,8 @@ class SpacesUploader:
       DO_SPACES_ENDPOINT   e.g. "https://fra1.digitaloceanspaces.com"
       DO_SPACES_CDN_BASE_URL e.g. "https://<bucket>.<region>.cdn.digitaloceanspaces.com"
                              OR your custom CDN domain
+      DO_SPACES_PART_SIZE_MB multipart part size (default 16; organic videos use >= 32)
+      DO_SPACES_CONCURRENCY  parallel part uploads (default 8; each in-flight part is held in memory)
     """
 
     def __init__(
@@ -86,16 +146,40 @@ class SpacesUploader:
 
         self.cdn_base_url = (cdn_base_url or os.getenv("DO_SPACES_CDN_BASE_URL") or "").strip().rstrip("/")
 
-        # ---- boto3 client ----
-        session = boto3.session.Session()
-        self.s3 = session.client(
-            "s3",
-            region_name=self.region,
-            endpoint_url=self.endpoint,
-            aws_access_key_id=self.key,
-            aws_secret_access_key=self.secret,
-            config=Config(signature_version="s3v4"),
-        )
+        # ---- boto3 client (shared) ----
+        self.s3 = self._get_client(self.endpoint, self.region, self.key, self.secret)
+
+    @classmethod
+    def _get_client(cls, endpoint: str, region: str, key: str, secret: str) -> Any:
+        """
+        boto3 clients are thread-safe; building one (endpoint/credential resolution, TLS context)
+        costs tens of ms, so build it once per credential set and share its connection pool.
+        """
+        cache_key = (endpoint, region, key, secret)
+        client = _CLIENT_CACHE.get(cache_key)
+        if client is not None:
+            return client
+
+        # boto3 Session creation is not thread-safe
+        with _CLIENT_LOCK:
+            client = _CLIENT_CACHE.get(cache_key)
+            if client is None:
+                session = boto3.session.Session()
+                client = session.client(
+                    "s3",
+                    region_name=region,
+                    endpoint_url=endpoint,
+                    aws_access_key_id=key,
+                    aws_secret_access_key=secret,
+                    config=Config(
+                        signature_version="s3v4",
+                        max_pool_connections=64,
+                        retries={"max_attempts": 3, "mode": "standard"},
+                        tcp_keepalive=True,
+                    ),
+                )
+                _CLIENT_CACHE[cache_key] = client
+        return client
 
     # ----------------- Core Upload -----------------
     def public_url_for_key(self, key: str) -> str:
@@ -104,6 +188,71 @@ class SpacesUploader:
             return f"{self.cdn_base_url}/{k}"
         return f"{self.endpoint}/{self.bucket}/{k}"
 
+    def key_for_public_url(self, url: str) -> Optional[str]:
+        """Inverse of public_url_for_key (None for URLs outside this bucket/CDN)."""
+        for base in (self.cdn_base_url, f"{self.endpoint}/{self.bucket}"):
+            if base and url.startswith(base + "/"):
+                return url[len(base) + 1:]
+        return None
+
+    def discard_ad_media(self, media: Dict[str, Any]) -> None:
+        """
+        Delete what save_ad_media() uploaded (abandoned run) and drop it from the video cache.
+        A cache hit ("cached": True) is left alone: those objects belong to the run that uploaded them.
+        """
+        if media.get("cached"):
+            return
+        urls = {media.get(k) for k in ("video_url", "thumbnail_url", "image_url")} - {None, ""}
+        with _AD_VIDEO_CACHE_LOCK:
+            for cache_key, cached in list(_AD_VIDEO_CACHE.items()):
+                if urls.intersection(u for u in cached.values() if u):
+                    del _AD_VIDEO_CACHE[cache_key]
+        for url in urls:
+            key = self.key_for_public_url(url)
+            if key:
+                self.s3.delete_object(Bucket=self.bucket, Key=key)
+
+    @staticmethod
+    def _new_key(*, filename: str, folder: str, content_type: Optional[str] = None) -> Tuple[str, str]:
+        """Random object key under folder (keeps the extension) + resolved content type."""
+        ext = os.path.splitext(filename)[1].lower()
+        ct = content_type or _EXT_CT.get(ext) or mimetypes.types_map.get(ext) or "application/octet-stream"
+
+        safe_folder = folder.strip("/")
+        key = f"{safe_folder}/{secrets.token_urlsafe(12)}{ext}"
+        return key, ct
+
+    def presign_upload(
+        self,
+        *,
+        filename: str,
+        folder: str,
+        content_type: Optional[str] = None,
+        acl: str = "public-read",
+        expires_in: int = 900,
+    ) -> Dict[str, Any]:
+        """
+        Presigned PUT so a client can upload straight to Spaces (bytes never touch our server).
+
+        Returns:
+          {"url": <presigned PUT url>, "key": ..., "public_url": ..., "headers": {...}}
+        The client must send exactly the returned headers with the PUT, since they are signed.
+        """
+        key, ct = self._new_key(filename=filename, folder=folder, content_type=content_type)
+
+        url = self.s3.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": self.bucket, "Key": key, "ContentType": ct, "ACL": acl},
+            ExpiresIn=expires_in,
+            HttpMethod="PUT",
+        )
+        return {
+            "url": url,
+            "key": key,
+            "public_url": self.public_url_for_key(key),
+            "headers": {"Content-Type": ct, "x-amz-acl": acl},
+        }
+
     def upload_fileobj(
         self,
         fileobj: BinaryIO,
@@ -112,27 +261,169 @@ class SpacesUploader:
         folder: str,
         content_type: Optional[str] = None,
         acl: str = "public-read",
+        part_size: Optional[int] = None,
     ) -> str:
-        ext = os.path.splitext(filename)[1].lower()
-        guessed_type = mimetypes.types_map.get(ext)
-        ct = content_type or guessed_type or "application/octet-stream"
-
-        safe_folder = folder.strip("/")
-        key = f"{safe_folder}/{uuid.uuid4().hex}{ext}"
+        key, ct = self._new_key(filename=filename, folder=folder, content_type=content_type)
+        part_size = part_size or _PART_SIZE
 
         try:
             fileobj.seek(0)
         except Exception:
             pass
 
+        size = self._stream_size(fileobj)
+        if size is not None and size < _SINGLE_PART_MAX:
+            body = fileobj.read()
+            self.s3.put_object(
+                Bucket=self.bucket,
+                Key=key,
+                Body=body,
+                ACL=acl,
+                ContentType=ct,
+                ContentMD5=self._content_md5(body),
+            )
+            return self.public_url_for_key(key)
+
+        # Backed by a real file on disk: let s3transfer read it by path (os-level reads, parallel parts)
+        path = self._disk_path(fileobj)
+        if path is not None:
+            self.s3.upload_file(
+                Filename=path,
+                Bucket=self.bucket,
+                Key=key,
+                ExtraArgs={"ACL": acl, "ContentType": ct},
+                Config=self._transfer_config(part_size),
+            )
+            return self.public_url_for_key(key)
+
+        if size is not None and size >= _LARGE_UPLOAD_THRESHOLD:
+            self._upload_multipart(
+                fileobj, key=key, extra_args={"ACL": acl, "ContentType": ct}, part_size=part_size
+            )
+            return self.public_url_for_key(key)
+
         self.s3.upload_fileobj(
             Fileobj=fileobj,
             Bucket=self.bucket,
             Key=key,
             ExtraArgs={"ACL": acl, "ContentType": ct},
+            Config=self._transfer_config(part_size),
         )
         return self.public_url_for_key(key)
 
+    # ----------------- Internal (large multipart) -----------------
+    @staticmethod
+    def _disk_path(fileobj: BinaryIO) -> Optional[str]:
+        """
+        Path of a read-only file object opened on a regular file, else None.
+        (TemporaryFile / rolled SpooledTemporaryFile names are fds or unlinked, so they don't qualify.)
+        """
+        name = getattr(fileobj, "name", None)
+        mode = getattr(fileobj, "mode", "") or ""
+        if not isinstance(name, str) or "r" not in mode or "+" in mode:
+            return None
+        return name if os.path.isfile(name) else None
+
+    @staticmethod
+    def _transfer_config(part_size: int) -> TransferConfig:
+        return TransferConfig(
+            multipart_threshold=part_size,
+            multipart_chunksize=part_size,
+            max_concurrency=_CONCURRENCY,
+            use_threads=True,
+            max_io_queue=100,
+        )
+
+    @staticmethod
+    def _content_md5(body: bytes) -> str:
+        """Base64 MD5 for the Content-MD5 header: Spaces verifies the bytes it stored against it."""
+        return base64.b64encode(hashlib.md5(body, usedforsecurity=False).digest()).decode("ascii")
+
+    @staticmethod
+    def _stream_size(fileobj: BinaryIO) -> Optional[int]:
+        """Remaining bytes from the current position, or None if the stream is not seekable."""
+        try:
+            pos = fileobj.tell()
+            end = fileobj.seek(0, os.SEEK_END)
+            fileobj.seek(pos)
+            return end - pos
+        except Exception:
+            return None
+
+    def _upload_part_with_retry(self, *, key: str, upload_id: str, part_number: int, body: bytes) -> Dict[str, Any]:
+        """Upload one part; only this part is retried (exponential backoff + jitter)."""
+        for attempt in range(1, _PART_MAX_ATTEMPTS + 1):
+            try:
+                resp = self.s3.upload_part(
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body,
+                    ContentMD5=self._content_md5(body),
+                )
+                return {"PartNumber": part_number, "ETag": resp["ETag"]}
+            except Exception:
+                if attempt == _PART_MAX_ATTEMPTS:
+                    raise
+                time.sleep(min(30.0, 0.5 * (2 ** attempt)) * random.uniform(0.5, 1.0))
+        raise RuntimeError("unreachable")
+
+    def _upload_multipart(
+        self,
+        fileobj: BinaryIO,
+        *,
+        key: str,
+        extra_args: Dict[str, str],
+        part_size: int,
+    ) -> None:
+        """
+        create_multipart_upload + concurrent upload_part + complete_multipart_upload.
+        Parts are read sequentially and at most _CONCURRENCY are in flight, so memory is
+        _CONCURRENCY * part_size (256 MiB for a video at the defaults). Aborts the upload on failure.
+        """
+        mpu = self.s3.create_multipart_upload(Bucket=self.bucket, Key=key, **extra_args)
+        upload_id = mpu["UploadId"]
+
+        parts: list[Dict[str, Any]] = []
+        try:
+            with ThreadPoolExecutor(max_workers=_CONCURRENCY) as pool:
+                pending: set[Future] = set()
+                part_number = 0
+                while True:
+                    chunk = fileobj.read(part_size)
+                    if not chunk:
+                        break
+                    part_number += 1
+                    pending.add(
+                        pool.submit(
+                            self._upload_part_with_retry,
+                            key=key,
+                            upload_id=upload_id,
+                            part_number=part_number,
+                            body=chunk,
+                        )
+                    )
+                    if len(pending) >= _CONCURRENCY:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        parts.extend(f.result() for f in done)
+
+                parts.extend(f.result() for f in pending)
+
+            parts.sort(key=lambda p: p["PartNumber"])
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            try:
+                self.s3.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            except Exception:
+                pass
+            raise
+
     # ----------------- ORGANIC HELPERS -----------------
     def upload_organic(
         self,
@@ -145,15 +436,18 @@ class SpacesUploader:
         if kind == "video":
             folder = "organic/videos"
             default_ct = "video/mp4"
+            part_size = _VIDEO_PART_SIZE  # videos are typically >100 MB
         else:
             folder = "organic/images"
             default_ct = "image/jpeg"
+            part_size = None
 
         return self.upload_fileobj(
             fileobj=fileobj,
             filename=filename,
             folder=folder,
             content_type=content_type or default_ct,
+            part_size=part_size,
         )
 
     def upload_organic_video(self, *, fileobj: BinaryIO, filename: str, content_type: Optional[str] = None) -> str:
@@ -162,14 +456,26 @@ class SpacesUploader:
     def upload_organic_image(self, *, fileobj: BinaryIO, filename: str, content_type: Optional[str] = None) -> str:
         return self.upload_organic(fileobj=fileobj, filename=filename, kind="image", content_type=content_type)
 
+    def upload_organic_from_path(self, path: Union[str, Path], *, kind: OrganicKind) -> str:
+        """
+        upload_organic() for a local file: opened read-only, so upload_fileobj streams it by path.
+        Content type comes from the extension (.mov -> video/quicktime, .png -> image/png).
+        """
+        p = Path(path)
+        with open(p, "rb") as f:
+            return self.upload_organic(
+                fileobj=f, filename=p.name, kind=kind, content_type=_EXT_CT.get(p.suffix.lower())
+            )
+
     # ----------------- Compatibility / Ads -----------------
-    def save_ad_media(self, upload_file: Any) -> Dict[str, Optional[str]]:
+    def save_ad_media(self, upload_file: Any) -> Dict[str, Any]:
         """
         Single entrypoint used by your console pipelines:
           media = media_mgr.save_ad_media(upload_file)
 
         Returns:
-          - video: {"video_url": str, "thumbnail_url": str|None, "image_url": None}
+          - video: {"video_url": str, "thumbnail_url": str|None, "image_url": None, "cached": bool}
+            (cached: True when the same bytes were already uploaded by this process)
           - image: {"image_url": str, "video_url": None, "thumbnail_url": None}
         """
         filename = getattr(upload_file, "filename", None) or "upload.bin"
@@ -187,22 +493,40 @@ class SpacesUploader:
 
         raise ValueError(f"Unsupported ad media type: {ext}")
 
+    def save_ad_media_from_path(self, path: Union[str, Path]) -> Dict[str, Any]:
+        """
+        save_ad_media() for a local file, without an UploadFile/spool wrapper: the file handle is
+        opened read-only, so upload_fileobj streams it by path (s3transfer multipart, no in-memory copy).
+        """
+        p = Path(path)
+        with open(p, "rb") as f:
+            return self.save_ad_media(SimpleNamespace(filename=p.name, file=f))
+
     def save_ad_video(
         self,
         upload_file: Any,
         *,
         extract_thumbnail: bool = True,
         min_width: int = 500,
-    ) -> Dict[str, Optional[str]]:
+    ) -> Dict[str, Any]:
         """
         Upload video to Spaces under ads/videos, optionally generate thumbnail under ads/thumbnails.
         - If OpenCV not available, thumbnail_url will be None.
+        - "cached" is True when the URLs come from an earlier upload of the same bytes.
         """
         filename = getattr(upload_file, "filename", None) or "video.mp4"
         fileobj = getattr(upload_file, "file", None)
         if fileobj is None:
             raise ValueError("save_ad_video expected upload_file.file (BinaryIO)")
 
+        digest = self._stream_digest(fileobj)
+        cache_key = (self.bucket, f"{digest}:{int(extract_thumbnail)}:{min_width}") if digest else None
+        if cache_key is not None:
+            with _AD_VIDEO_CACHE_LOCK:
+                cached = _AD_VIDEO_CACHE.get(cache_key)
+            if cached is not None:
+                return {**cached, "cached": True}
+
         # Upload video
         video_url = self.upload_fileobj(
             fileobj=fileobj,
@@ -225,7 +549,13 @@ class SpacesUploader:
             except Exception:
                 thumbnail_url = None
 
-        return {"video_url": video_url, "thumbnail_url": thumbnail_url, "image_url": None}
+        result: Dict[str, Optional[str]] = {"video_url": video_url, "thumbnail_url": thumbnail_url, "image_url": None}
+        if cache_key is not None:
+            with _AD_VIDEO_CACHE_LOCK:
+                if len(_AD_VIDEO_CACHE) >= _AD_VIDEO_CACHE_MAX:
+                    _AD_VIDEO_CACHE.pop(next(iter(_AD_VIDEO_CACHE)))
+                _AD_VIDEO_CACHE[cache_key] = result
+        return {**result, "cached": False}
 
     def save_ad_image(
         self,
@@ -236,6 +566,7 @@ class SpacesUploader:
         """
         Upload image to Spaces under ads/images.
         - If PIL exists: converts to RGB, center-crops to 4:5, resizes, saves baseline JPEG (Meta-safe).
+          A JPEG that is already target_size is uploaded untouched.
         - Otherwise uploads as-is.
         """
         filename = getattr(upload_file, "filename", None) or "image.jpg"
@@ -258,13 +589,35 @@ class SpacesUploader:
                 "thumbnail_url": None,
             }
 
-        # Read bytes then process
+        # Decode straight from the stream (no full bytes copy)
         try:
             try:
                 fileobj.seek(0)
             except Exception:
                 pass
-            raw = fileobj.read()
+            if not fileobj.read(1):
+                raise ValueError("Empty image upload")
+            fileobj.seek(0)
+
+            img = Image.open(fileobj)  # header only until .load()
+
+            # Already a Meta-ready baseline JPEG at the target size: upload original bytes as-is
+            if (
+                img.format == "JPEG"
+                and img.size == tuple(target_size)
+                and img.mode in ("RGB", "L")
+                and not img.info.get("progressive")
+            ):
+                fileobj.seek(0)
+                image_url = self.upload_fileobj(
+                    fileobj=fileobj,
+                    filename=filename,
+                    folder="ads/images",
+                    content_type="image/jpeg",
+                )
+                return {"image_url": image_url, "video_url": None, "thumbnail_url": None}
+
+            img.load()
         finally:
             # reset for any future reuse
             try:
@@ -272,36 +625,23 @@ class SpacesUploader:
             except Exception:
                 pass
 
-        if not raw:
-            raise ValueError("Empty image upload")
-
-        img = Image.open(io.BytesIO(raw))
         img = img.convert("RGB")
 
         tw, th = target_size
-        target_ratio = tw / th
 
         w, h = img.size
         if w <= 0 or h <= 0:
             raise ValueError("Invalid image dimensions")
 
-        src_ratio = w / h
+        # cheap integer box pre-downscale (C) so LANCZOS only covers the last <2x
+        factor = min(w // tw, h // th)
+        if factor >= 2:
+            img = img.reduce(factor)
 
-        # center-crop
-        if src_ratio > target_ratio:
-            new_w = int(h * target_ratio)
-            left = max(0, (w - new_w) // 2)
-            img = img.crop((left, 0, left + new_w, h))
-        else:
-            new_h = int(w / target_ratio)
-            top = max(0, (h - new_h) // 2)
-            img = img.crop((0, top, w, top + new_h))
+        # center-crop + resize in a single resample pass
+        img = ImageOps.fit(img, (tw, th), method=Image.LANCZOS, centering=(0.5, 0.5))
 
-        img = img.resize((tw, th), Image.LANCZOS)
-
-        out = io.BytesIO()
-        img.save(out, format="JPEG", quality=92, optimize=True, progressive=False)
-        out.seek(0)
+        out = io.BytesIO(self._encode_jpeg(img, quality=92))
 
         image_url = self.upload_fileobj(
             fileobj=out,
@@ -311,15 +651,103 @@ class SpacesUploader:
         )
         return {"image_url": image_url, "video_url": None, "thumbnail_url": None}
 
+    # ----------------- Async wrappers -----------------
+    # Decode/resample/encode and the boto3 upload are all blocking; run them on the
+    # default thread pool so an event loop (FastAPI async handlers) is never stalled.
+    # PIL and OpenCV release the GIL in their C loops, so concurrent uploads use
+    # multiple cores.
+    async def save_ad_media_async(self, upload_file: Any) -> Dict[str, Optional[str]]:
+        return await asyncio.to_thread(self.save_ad_media, upload_file)
+
+    async def save_ad_video_async(self, upload_file: Any, **kwargs: Any) -> Dict[str, Optional[str]]:
+        return await asyncio.to_thread(self.save_ad_video, upload_file, **kwargs)
+
+    async def save_ad_image_async(self, upload_file: Any, **kwargs: Any) -> Dict[str, Optional[str]]:
+        return await asyncio.to_thread(self.save_ad_image, upload_file, **kwargs)
+
+    # ----------------- Internal (JPEG encode) -----------------
+    @staticmethod
+    def _encode_jpeg(img: Any, *, quality: int = 92) -> bytes:
+        """
+        Baseline JPEG encode for an RGB PIL image.
+        Uses libjpeg-turbo (PyTurboJPEG) when installed, otherwise Pillow.
+        No Huffman optimize pass: it roughly doubles encode time for a few % of size.
+        """
+        if HAS_TURBOJPEG:
+            return _TURBOJPEG.encode(np.asarray(img), quality=quality, pixel_format=TJPF_RGB)  # type: ignore[name-defined]
+
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=quality, progressive=False)
+        return out.getvalue()
+
+    # ----------------- Internal (content digest) -----------------
+    @staticmethod
+    def _stream_digest(fileobj: BinaryIO) -> Optional[str]:
+        """
+        blake2b-128 of the whole stream (1 MiB reads); leaves the stream rewound.
+        This is an extra full read of every video before the upload reads it again: cheap next
+        to the network upload it can skip on a repeat, but not free for a one-off.
+        Returns None for a non-seekable stream (reading it would leave nothing to upload).
+        """
+        try:
+            fileobj.seek(0)
+        except Exception:
+            return None
+        h = hashlib.blake2b(digest_size=16)
+        for chunk in iter(lambda: fileobj.read(_MB), b""):
+            h.update(chunk)
+        try:
+            fileobj.seek(0)
+        except Exception:
+            return None
+        return h.hexdigest()
+
     # ----------------- Internal (OpenCV thumbnail) -----------------
+    @staticmethod
+    def _copy_to_path(fileobj: BinaryIO, path: str) -> None:
+        """
+        Copy the whole stream to path. File-backed streams (plain files, rolled-over
+        SpooledTemporaryFile) are copied in-kernel with copy_file_range; anything else
+        goes through Python in 1 MiB chunks instead of one full read().
+        """
+        # SpooledTemporaryFile.fileno() would force a rollover: look at the backing file instead
+        raw = getattr(fileobj, "_file", fileobj)
+        src_fd: Optional[int] = None
+        if hasattr(os, "copy_file_range"):
+            try:
+                src_fd = raw.fileno()
+            except Exception:
+                src_fd = None
+
+        with open(path, "wb") as dst:
+            if src_fd is not None:
+                try:
+                    offset = 0
+                    while True:
+                        n = os.copy_file_range(src_fd, dst.fileno(), _MB * 64, offset, offset)
+                        if n == 0:
+                            return
+                        offset += n
+                except OSError:
+                    dst.seek(0)
+                    dst.truncate()
+                    fileobj.seek(0)
+            shutil.copyfileobj(fileobj, dst, length=_MB)
+
     def _extract_first_frame_bytes(self, fileobj: BinaryIO, filename: str, *, min_width: int = 500) -> Optional[bytes]:
         """
-        Writes the uploaded video stream to a temp file, reads first frame, returns JPEG bytes.
+        Reads the first frame of the video stream, returns JPEG bytes.
+        File-backed streams (save_ad_media_from_path) are opened by OpenCV in place;
+        anything else is written to a temp file first.
         Requires OpenCV. Best-effort; returns None on failure.
         """
         if not HAS_CV2:
             return None
 
+        disk_path = self._disk_path(fileobj)
+        if disk_path is not None:
+            return self._first_frame_jpeg(disk_path, min_width=min_width)
+
         suffix = Path(filename).suffix.lower() or ".mp4"
         tmp_vid = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
         tmp_vid_path = tmp_vid.name
@@ -331,8 +759,7 @@ class SpacesUploader:
                 fileobj.seek(0)
             except Exception:
                 pass
-            with open(tmp_vid_path, "wb") as f:
-                f.write(fileobj.read())
+            self._copy_to_path(fileobj, tmp_vid_path)
 
             # reset stream for caller
             try:
@@ -340,31 +767,35 @@ class SpacesUploader:
             except Exception:
                 pass
 
-            cap = cv2.VideoCapture(tmp_vid_path)  # type: ignore[name-defined]
-            ok, frame = cap.read()
-            cap.release()
-            if not ok or frame is None:
-                return None
-
-            h, w = frame.shape[:2]
-            if w > 0 and w < min_width:
-                scale = min_width / float(w)
-                frame = cv2.resize(  # type: ignore[name-defined]
-                    frame,
-                    (min_width, int(round(h * scale))),
-                    interpolation=cv2.INTER_LANCZOS4,  # type: ignore[name-defined]
-                )
-
-            ok2, jpg = cv2.imencode(".jpg", frame)  # type: ignore[name-defined]
-            if not ok2:
-                return None
-            return bytes(jpg.tobytes())
+            return self._first_frame_jpeg(tmp_vid_path, min_width=min_width)
         finally:
             try:
                 os.remove(tmp_vid_path)
             except Exception:
                 pass
 
+    @staticmethod
+    def _first_frame_jpeg(path: str, *, min_width: int) -> Optional[bytes]:
+        cap = cv2.VideoCapture(path)  # type: ignore[name-defined]
+        ok, frame = cap.read()
+        cap.release()
+        if not ok or frame is None:
+            return None
+
+        h, w = frame.shape[:2]
+        if w > 0 and w < min_width:
+            scale = min_width / float(w)
+            frame = cv2.resize(  # type: ignore[name-defined]
+                frame,
+                (min_width, int(round(h * scale))),
+                interpolation=cv2.INTER_LANCZOS4,  # type: ignore[name-defined]
+            )
+
+        ok2, jpg = cv2.imencode(".jpg", frame)  # type: ignore[name-defined]
+        if not ok2:
+            return None
+        return bytes(jpg.tobytes())
+
 
 class SpacesMediaManager(SpacesUploader):
     """
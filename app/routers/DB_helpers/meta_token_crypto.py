@@ -1,8 +1,22 @@
 # app/routers/meta_token_crypto.py
 from __future__ import annotations
 
+import base64
 import hashlib
-from cryptography.fernet import Fernet
+import hmac
+from typing import List
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+# Fernet token layout: version(1) | timestamp(8) | iv(16) | ciphertext(n*16) | hmac(32)
+_FERNET_VERSION = 0x80
+_MIN_TOKEN_LEN = 1 + 8 + 16 + 16 + 32
+
+
+def _fp(plaintext: str) -> str:
+    # not memoized: a cache would keep plaintext tokens alive as keys; one hash is cheap
+    return hashlib.sha256(plaintext.encode("utf-8")).hexdigest()
 
 
 class MetaTokenCrypto:
@@ -10,11 +24,64 @@ class MetaTokenCrypto:
         key_bytes = fernet_key.encode("utf-8") if isinstance(fernet_key, str) else fernet_key
         self.fernet = Fernet(key_bytes)
 
+        # pre-split the Fernet key once (signing | encryption) for decrypt_fast
+        raw_key = base64.urlsafe_b64decode(key_bytes)
+        self._signing_key, self._enc_key = raw_key[:16], raw_key[16:]
+
     def encrypt(self, plaintext: str) -> str:
         return self.fernet.encrypt(plaintext.encode("utf-8")).decode("utf-8")
 
     def decrypt(self, ciphertext: str) -> str:
         return self.fernet.decrypt(ciphertext.encode("utf-8")).decode("utf-8")
 
+    def decrypt_fast(self, ciphertext: str) -> str:
+        """
+        Fernet decrypt on the raw primitives (HMAC-SHA256 + AES-128-CBC, both OpenSSL EVP / AES-NI),
+        for rows we wrote ourselves. Still verifies the HMAC; skips only the TTL/timestamp policy,
+        which decrypt() doesn't use either. Raises cryptography.fernet.InvalidToken like decrypt().
+        Not on the token read path (MetaTokenDbReader uses decrypt()) until it has a parity
+        check against Fernet.encrypt output: good tokens, tampered HMAC, bad version, bad base64.
+        """
+        mac = hmac.new(self._signing_key, digestmod=hashlib.sha256)
+        return self._decrypt_raw(ciphertext, mac, algorithms.AES(self._enc_key))
+
+    def decrypt_many(self, ciphertexts: List[str]) -> List[str]:
+        """
+        decrypt_fast() over a batch (token audits / rotations): the keyed HMAC context and the
+        AES key object are built once and cloned/shared per token. Raises InvalidToken on the
+        first bad row.
+        """
+        mac = hmac.new(self._signing_key, digestmod=hashlib.sha256)
+        aes = algorithms.AES(self._enc_key)
+        return [self._decrypt_raw(c, mac, aes) for c in ciphertexts]
+
+    @staticmethod
+    def _decrypt_raw(ciphertext: str, mac: "hmac.HMAC", aes: algorithms.AES) -> str:
+        try:
+            data = base64.urlsafe_b64decode(ciphertext)
+        except Exception as e:
+            raise InvalidToken from e
+
+        if len(data) < _MIN_TOKEN_LEN or data[0] != _FERNET_VERSION:
+            raise InvalidToken
+
+        body, sig = data[:-32], data[-32:]
+        h = mac.copy()
+        h.update(body)
+        if not hmac.compare_digest(h.digest(), sig):
+            raise InvalidToken
+
+        iv = body[9:25]
+        decryptor = Cipher(aes, modes.CBC(iv)).decryptor()
+        padded = decryptor.update(body[25:]) + decryptor.finalize()
+
+        try:
+            unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+            plaintext = unpadder.update(padded) + unpadder.finalize()
+        except ValueError as e:
+            raise InvalidToken from e
+
+        return plaintext.decode("utf-8")
+
     def fingerprint(self, plaintext: str) -> str:
-        return hashlib.sha256(plaintext.encode("utf-8")).hexdigest()
+        return _fp(plaintext)
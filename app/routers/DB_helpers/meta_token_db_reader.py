@@ -4,9 +4,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional, Sequence, Any, Dict
 import hashlib
+import threading
 
 import psycopg
-from psycopg.rows import dict_row
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import ConnectionPool
 from cryptography.fernet import Fernet
 
 from app.routers.DB_helpers.meta_token_crypto import MetaTokenCrypto
@@ -15,6 +17,24 @@ class DbReadError(Exception):
     pass
 
 
+# One pool per database_url, shared by every reader built with shared_pool()
+_POOLS: Dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def shared_pool(database_url: str, *, min_size: int = 1, max_size: int = 10) -> ConnectionPool:
+    """Process-wide psycopg pool for database_url (created on first use)."""
+    pool = _POOLS.get(database_url)
+    if pool is not None:
+        return pool
+    with _POOLS_LOCK:
+        pool = _POOLS.get(database_url)
+        if pool is None:
+            pool = ConnectionPool(database_url, min_size=min_size, max_size=max_size, open=True)
+            _POOLS[database_url] = pool
+    return pool
+
+
 @dataclass(frozen=True)
 class ActiveToken:
     owner_type: str         # 'user' or 'page'
@@ -39,9 +59,11 @@ class MetaTokenDbReader:
       - created_at
     """
 
-    def __init__(self, database_url: str, fernet_key: str) -> None:
+    def __init__(self, database_url: str, fernet_key: str, pool: Optional[ConnectionPool] = None) -> None:
+        """pool: borrow warm connections from it (e.g. shared_pool(database_url)) instead of connecting per query."""
         self.database_url = database_url
         self.crypto = MetaTokenCrypto(fernet_key)
+        self.pool = pool
 
     # -------- tokens --------
 
@@ -55,23 +77,25 @@ class MetaTokenDbReader:
             LIMIT 1
             """,
             (client_id, owner_type, owner_id),
+            row_factory=tuple_row,
         )
         if not row:
             raise DbReadError(f"No active token found for client_id={client_id} owner_type={owner_type} owner_id={owner_id}")
 
-        token = self._decrypt(row["access_token_ciphertext"])
-        scopes = row.get("scopes") or []
-  
-     
+        # fixed column list: unpack positionally (no per-row dict)
+        row_owner_type, row_owner_id, ciphertext, scopes, expires_at = row
+        token = self._decrypt(ciphertext)
+        scopes = scopes or []
+
         # scopes can be stored as json/array/text; normalize to list[str]
         if isinstance(scopes, str):
             scopes = [s.strip() for s in scopes.replace(",", " ").split() if s.strip()]
         return ActiveToken(
-            owner_type=str(row["owner_type"]),
-            owner_id=str(row["owner_id"]),
+            owner_type=str(row_owner_type),
+            owner_id=str(row_owner_id),
             access_token=token,
             scopes=list(scopes),
-            expires_at=str(row.get("expires_at")) if row.get("expires_at") else None,
+            expires_at=str(expires_at) if expires_at else None,
         )
 
     def get_active_user_token(self, client_id: str, meta_user_id: str) -> ActiveToken:
@@ -125,14 +149,70 @@ class MetaTokenDbReader:
         )
         return row["ig_user_id"] if row else None
 
+    def get_latest_bundle_for_client(self, client_id: str) -> Dict[str, Any]:
+        """
+        The three lookups above in one round-trip:
+          {"meta_user": {...} | None, "meta_page": {...} | None, "ig_actor_id": str | None}
+        Each table is still read independently (latest row per client), so a missing
+        page / IG link doesn't hide the others.
+        """
+        row = self._fetchone(
+            """
+            SELECT mu.meta_user_id, mu.name AS user_name, mu.email,
+                   mp.page_id, mp.connected_meta_user_id, mp.name AS page_name, mp.category,
+                   ia.ig_user_id
+            FROM (SELECT 1) AS one
+            LEFT JOIN LATERAL (
+                SELECT meta_user_id, name, email
+                FROM meta_user
+                WHERE client_id=%s
+                ORDER BY created_at DESC NULLS LAST
+                LIMIT 1
+            ) mu ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT page_id, connected_meta_user_id, name, category
+                FROM meta_page
+                WHERE client_id=%s
+                ORDER BY created_at DESC NULLS LAST
+                LIMIT 1
+            ) mp ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT ig_user_id
+                FROM instagram_account
+                WHERE client_id=%s
+                ORDER BY created_at DESC
+                LIMIT 1
+            ) ia ON TRUE
+            """,
+            (client_id, client_id, client_id),
+        )
+        row = row or {}
+        meta_user = None
+        if row.get("meta_user_id") is not None:
+            meta_user = {"meta_user_id": row["meta_user_id"], "name": row["user_name"], "email": row["email"]}
+        meta_page = None
+        if row.get("page_id") is not None:
+            meta_page = {
+                "page_id": row["page_id"],
+                "connected_meta_user_id": row["connected_meta_user_id"],
+                "name": row["page_name"],
+                "category": row["category"],
+            }
+        return {"meta_user": meta_user, "meta_page": meta_page, "ig_actor_id": row.get("ig_user_id")}
+
     # -------- internal --------
     def _decrypt(self, ciphertext: str) -> str:
         return self.crypto.decrypt(ciphertext)
 
 
-    def _fetchone(self, sql: str, params: tuple) -> Optional[dict]:
+    def _fetchone(self, sql: str, params: tuple, row_factory: Any = dict_row) -> Optional[Any]:
         try:
-            with psycopg.connect(self.database_url, row_factory=dict_row) as conn:
+            if self.pool is not None:
+                with self.pool.connection() as conn:
+                    with conn.cursor(row_factory=row_factory) as cur:
+                        cur.execute(sql, params)
+                        return cur.fetchone()
+            with psycopg.connect(self.database_url, row_factory=row_factory) as conn:
                 with conn.cursor() as cur:
                     cur.execute(sql, params)
                     return cur.fetchone()
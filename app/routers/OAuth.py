@@ -3,10 +3,58 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Sequence
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+from urllib.parse import quote, urlencode
+import hashlib
 import secrets
+import threading
+import time
+import httpx
 import requests
 
+# Optional dependency (graceful)
+try:
+    import h2  # type: ignore  # noqa: F401  (httpx[http2])
+    HAS_H2 = True
+except Exception:
+    HAS_H2 = False
+
+# Shared across every OAuth instance: one keep-alive (HTTP/2 when available) session to graph.facebook.com
+_HTTP = httpx.Client(
+    http2=HAS_H2,
+    timeout=20.0,
+    limits=httpx.Limits(max_keepalive_connections=20),
+)
+
+# Short-lived cache for the read-only graph lookups (/me, /me/accounts, page -> IG),
+# keyed by (call, token fingerprint) so a repeated callback doesn't re-fetch them
+_GRAPH_CACHE_TTL_S = 300.0
+_GRAPH_CACHE_MAX = 256
+_GRAPH_CACHE: Dict[Tuple[str, str, str], Tuple[float, Any]] = {}
+_GRAPH_CACHE_LOCK = threading.Lock()
+
+
+def _token_key(token: str) -> str:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _cached_get_json(cache_key: Tuple[str, str, str], fn: Callable[..., Any], *args: Any) -> Any:
+    now = time.monotonic()
+    with _GRAPH_CACHE_LOCK:
+        hit = _GRAPH_CACHE.get(cache_key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+
+    value = fn(*args)
+
+    with _GRAPH_CACHE_LOCK:
+        if len(_GRAPH_CACHE) >= _GRAPH_CACHE_MAX:
+            expired = [k for k, (exp, _) in _GRAPH_CACHE.items() if exp <= now]
+            for k in expired or [next(iter(_GRAPH_CACHE))]:  # else drop the oldest entry
+                _GRAPH_CACHE.pop(k, None)
+        _GRAPH_CACHE[cache_key] = (now + _GRAPH_CACHE_TTL_S, value)
+    return value
+
 
 class OAuthError(Exception):
     pass
@@ -39,16 +87,30 @@ class OAuth:
         app_secret: str,
         redirect_uri: str,
         graph_version: str = "v17.0",
-        session: Optional[requests.Session] = None,
+        session: Optional[Union[httpx.Client, requests.Session]] = None,
         timeout_s: int = 20,
     ) -> None:
         self.app_id = app_id
         self.app_secret = app_secret
         self.redirect_uri = redirect_uri
         self.graph_version = graph_version
-        self.http = session or requests.Session()
+        self.http = session or _HTTP
         self.timeout_s = timeout_s
 
+    def warm_up(self) -> None:
+        """
+        Open the shared keep-alive connection to graph.facebook.com (DNS + TCP + TLS) ahead of
+        the first real call. Best-effort: any failure is ignored. Safe to run in a background thread.
+        """
+        try:
+            self.http.get(
+                f"https://graph.facebook.com/{self.graph_version}/me",
+                params={"fields": "id"},
+                timeout=self.timeout_s,
+            )
+        except Exception:
+            pass
+
     def generate_state(self, nbytes: int = 32) -> str:
         return secrets.token_urlsafe(nbytes)
 
@@ -59,15 +121,17 @@ class OAuth:
         we use commas to stay compatible with your existing code.
         """
         base = f"https://www.facebook.com/{self.graph_version}/dialog/oauth"
-        scope_str = ",".join(scopes)
-        return (
-            f"{base}"
-            f"?client_id={requests.utils.quote(str(self.app_id), safe='')}"
-            f"&redirect_uri={requests.utils.quote(self.redirect_uri, safe='')}"
-            f"&response_type=code"
-            f"&state={requests.utils.quote(state, safe='')}"
-            f"&scope={requests.utils.quote(scope_str, safe='')}"
+        qs = urlencode(
+            {
+                "client_id": self.app_id,
+                "redirect_uri": self.redirect_uri,
+                "response_type": "code",
+                "state": state,
+                "scope": ",".join(scopes),
+            },
+            quote_via=quote,
         )
+        return f"{base}?{qs}"
 
     def build_business_auth_url(self, state: str, config_id: str) -> str:
         """
@@ -77,16 +141,24 @@ class OAuth:
           - config_id is required for the business login configuration.
         """
         base = f"https://www.facebook.com/{self.graph_version}/dialog/oauth"
-        return (
-            f"{base}"
-            f"?client_id={requests.utils.quote(str(self.app_id), safe='')}"
-            f"&redirect_uri={requests.utils.quote(self.redirect_uri, safe='')}"
-            f"&response_type=code"
-            f"&state={requests.utils.quote(state, safe='')}"
-            f"&config_id={requests.utils.quote(str(config_id), safe='')}"
+        qs = urlencode(
+            {
+                "client_id": self.app_id,
+                "redirect_uri": self.redirect_uri,
+                "response_type": "code",
+                "state": state,
+                "config_id": config_id,
+            },
+            quote_via=quote,
         )
+        return f"{base}?{qs}"
 
     def extract_code_from_callback(self, query_params: Dict[str, Any], expected_state: str) -> str:
+        code = query_params.get("code")
+        state = query_params.get("state")
+        if code and state == expected_state and "error" not in query_params:
+            return str(code)  # happy path
+
         if "error" in query_params:
             raise OAuthError(
                 f"Meta OAuth error: {query_params.get('error')} - {query_params.get('error_description')}"
@@ -142,14 +214,14 @@ class OAuth:
     def get_me(self, user_access_token: str) -> Dict[str, Any]:
         url = f"https://graph.facebook.com/{self.graph_version}/me"
         params = {"fields": "id,name,email", "access_token": user_access_token}
-        return self._get_json(url, params)
+        return _cached_get_json(("me", "", _token_key(user_access_token)), self._get_json, url, params)
 
     def _get_json(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
         try:
             resp = self.http.get(url, params=params, timeout=self.timeout_s)
             resp.raise_for_status()
             data = resp.json()
-        except requests.RequestException as e:
+        except (httpx.HTTPError, requests.RequestException) as e:
             raise OAuthError(f"HTTP error: {e}") from e
         except ValueError as e:
             raise OAuthError("Non-JSON response from Meta.") from e
@@ -168,7 +240,9 @@ class OAuth:
         """
         url = f"https://graph.facebook.com/{self.graph_version}/me/accounts"
         params = {"access_token": long_lived_user_token}
-        data = self._get_json(url, params)
+        data = _cached_get_json(
+            ("me/accounts", "", _token_key(long_lived_user_token)), self._get_json, url, params
+        )
 
         pages = data.get("data")
         if not pages or not isinstance(pages, list):
@@ -253,7 +327,9 @@ class OAuth:
             "access_token": page_access_token,
         }
 
-        data = self._get_json(url, params)
+        data = _cached_get_json(
+            ("page_ig", str(page_id), _token_key(page_access_token)), self._get_json, url, params
+        )
         iba = (data or {}).get("instagram_business_account") or {}
 
         return {
@@ -1,19 +1,29 @@
 # app/Meta_OAuth.py
 
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from typing import List
+import psycopg
+from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
+import threading
 import uuid
 import os
 import requests
 from datetime import datetime, timedelta
-import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI()
+# Optional dependency (graceful)
+try:
+    import orjson  # noqa: F401  (used by ORJSONResponse)
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+app = FastAPI(default_response_class=ORJSONResponse if HAS_ORJSON else JSONResponse)
 
 # Database connection parameters (same as you were using)
 DB_HOST = "localhost"
@@ -26,25 +36,43 @@ META_APP_SECRET = os.getenv("META_APP_SECRET_0")
 META_REDIRECT_URI = os.getenv("META_REDIRECT_URI")
 
 # ----------------- DATABASE HELPER -----------------
-def get_db_connection():
+_db_pool: ConnectionPool | None = None
+_db_pool_lock = threading.Lock()
+
+
+def get_db_pool() -> ConnectionPool:
     """
-    Returns a connection to PostgreSQL.
-    Keeps trying if connection fails.
+    Returns the shared psycopg3 connection pool (created on first use).
+    The pool keeps reconnecting in the background if the database is down.
     """
-    while True:
-        try:
-            conn = psycopg2.connect(
+    global _db_pool
+    if _db_pool is not None:
+        return _db_pool
+
+    with _db_pool_lock:
+        if _db_pool is None:
+            conninfo = psycopg.conninfo.make_conninfo(
                 host=DB_HOST,
-                database=DB_NAME,
+                dbname=DB_NAME,
                 user=DB_USER,
                 password=DB_PASSWORD,
-                cursor_factory=RealDictCursor
             )
-            print("Database connected successfully")
-            return conn
-        except Exception as e:
-            print("Database connection failed:", e)
-            time.sleep(2)
+            _db_pool = ConnectionPool(
+                conninfo,
+                min_size=2,
+                max_size=16,
+                kwargs={"row_factory": dict_row},
+                open=True,
+            )
+    return _db_pool
+
+
+def get_db_connection():
+    """
+    Borrows a pooled PostgreSQL connection:
+    commits on success, rolls back on exception, always returns it to the pool.
+    """
+    return get_db_pool().connection()
 
 
 # ----------------- Pydantic Models -----------------
@@ -53,36 +81,63 @@ class ClientCreate(BaseModel):
     email: str
 
 # ----------------- ROUTES -----------------
+def _oauth_url(client_id: str) -> str:
+    return (
+        f"https://www.facebook.com/v17.0/dialog/oauth?"
+        f"client_id={META_APP_ID}&redirect_uri={META_REDIRECT_URI}"
+        f"&scope=instagram_basic,pages_show_list,pages_manage_ads,ads_management"
+        f"&state={client_id}"
+    )
+
+
 @app.post("/register")
 def register_client(client: ClientCreate):
     """
     Register a new client and return the Meta OAuth URL.
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
     client_id = str(uuid.uuid4())
-    
+
     try:
-        cur.execute(
-            "INSERT INTO clients (id, name, email) VALUES (%s, %s, %s) RETURNING id;",
-            (client_id, client.name, client.email)
-        )
-        conn.commit()
+        with get_db_connection() as conn:
+            # same SQL every call: server-side prepared once per pooled connection
+            conn.execute(
+                "INSERT INTO clients (id, name, email) VALUES (%s, %s, %s) RETURNING id;",
+                (client_id, client.name, client.email),
+                prepare=True,
+            )
     except Exception as e:
-        conn.rollback()
         raise HTTPException(status_code=400, detail=str(e))
-    finally:
-        cur.close()
-        conn.close()
 
-    oauth_url = (
-        f"https://www.facebook.com/v17.0/dialog/oauth?"
-        f"client_id={META_APP_ID}&redirect_uri={META_REDIRECT_URI}"
-        f"&scope=instagram_basic,pages_show_list,pages_manage_ads,ads_management"
-        f"&state={client_id}"
-    )
+    return {"client_id": client_id, "oauth_url": _oauth_url(client_id)}
 
-    return {"client_id": client_id, "oauth_url": oauth_url}
+
+@app.post("/register/bulk")
+def register_clients_bulk(clients: List[ClientCreate]):
+    """
+    Register many clients at once (cohort onboarding / test setup).
+    psycopg3 executemany pipelines the INSERTs, so N clients cost ~1 round-trip instead of N.
+    """
+    if not clients:
+        return {"clients": []}
+
+    rows = [(str(uuid.uuid4()), c.name, c.email) for c in clients]
+
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.executemany(
+                    "INSERT INTO clients (id, name, email) VALUES (%s, %s, %s);",
+                    rows,
+                )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "clients": [
+            {"client_id": client_id, "oauth_url": _oauth_url(client_id)}
+            for client_id, _, _ in rows
+        ]
+    }
 
 
 @app.get("/auth/meta/callback")
@@ -105,24 +160,26 @@ def meta_callback(request: Request, code: str, state: str):
 
     short_lived_expires_at = datetime.utcnow() + timedelta(hours=2)
 
-    # Use the same connection function
-    conn = get_db_connection()
-    cur = conn.cursor()
+    # Validate state (must be a registered client) and store the token in ONE round-trip:
+    # no separate SELECT, and no window between the check and the insert.
     try:
-        cur.execute(
-            """
-            INSERT INTO meta_tokens (client_id, short_lived_token, short_lived_expires_at,
-                                     long_lived_token, long_lived_expires_at)
-            VALUES (%s, %s, %s, %s, %s);
-            """,
-            (state, short_lived_token, short_lived_expires_at, None, None)
-        )
-        conn.commit()
+        with get_db_connection() as conn:
+            row = conn.execute(
+                """
+                INSERT INTO meta_tokens (client_id, short_lived_token, short_lived_expires_at,
+                                         long_lived_token, long_lived_expires_at)
+                SELECT c.id, %s, %s, %s, %s
+                FROM clients c
+                WHERE c.id = %s
+                RETURNING client_id;
+                """,
+                (short_lived_token, short_lived_expires_at, None, None, state),
+                prepare=True,
+            ).fetchone()
     except Exception as e:
-        conn.rollback()
         raise HTTPException(status_code=500, detail=f"Database insert failed: {e}")
-    finally:
-        cur.close()
-        conn.close()
+
+    if row is None:
+        raise HTTPException(status_code=400, detail="Invalid OAuth state (unknown client).")
 
     return {"message": "Meta access granted, short-lived token stored."}
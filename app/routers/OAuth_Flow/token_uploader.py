@@ -6,6 +6,7 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Dict, Optional, Sequence
 
@@ -106,14 +107,18 @@ class MetaOAuthTokenUploader:
             # 3) short-lived -> long-lived
             long_tok = self.oauth.exchange_short_lived_for_long_lived_token(short_tok.access_token)
 
-            # 4) /me
-            me = self.oauth.get_me(long_tok.access_token)
+            # 4) /me + 5) list pages: independent once we hold the long-lived token,
+            # so fire both at once (shared HTTP client is thread-safe)
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                me_fut = pool.submit(self.oauth.get_me, long_tok.access_token)
+                pages_fut = pool.submit(self.oauth.get_pages_dict, long_tok.access_token)
+                me = me_fut.result()
+                pages = pages_fut.result()
+
             meta_user_id = str(me["id"])
             meta_user_name = me.get("name")
             meta_user_email = me.get("email")
 
-            # 5) list pages + select one
-            pages = self.oauth.get_pages_dict(long_tok.access_token)
             selected = self.oauth.select_page_by_index(pages, page_choice)
 
             page_id = str(selected["id"])